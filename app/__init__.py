@@ -14,9 +14,8 @@ def create_app():
     # User loader configuration
     @login_manager.user_loader
     def load_user(user_id):
-        from app.database import get_db
-        db = get_db()
-        user_data = db.users.find_one({"_id": user_id})
+        from app.database import get_user_by_id
+        user_data = get_user_by_id(user_id)
         return User(user_data) if user_data else None
 
     from app.routes.auth import bp as auth_bp
@@ -30,5 +29,12 @@ def create_app():
     app.register_blueprint(player_bp)
     app.register_blueprint(chatbot_bp)
     app.register_blueprint(podcast_bp)
+
+    # Create database indexes once at startup
+    from app.database import ensure_indexes
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"Could not create MongoDB indexes: {e}")
     
     return app
\ No newline at end of file
@@ -9,4 +9,13 @@ class Config:
         'db': 'english_learning',
         'host': 'mongodb://localhost:27017/english_learning'
     }
-    Groq_API_KEY = os.getenv('Groq_API_KEY')
\ No newline at end of file
+    Groq_API_KEY = os.getenv('Groq_API_KEY')
+    # Word explanation cache used by the video player
+    EXPLANATION_CACHE_PATH = os.getenv('EXPLANATION_CACHE_PATH') or os.path.join(os.getcwd(), 'explanation_cache', 'explanations.sqlite3')
+    EXPLANATION_CACHE_TTL_SECONDS = int(os.getenv('EXPLANATION_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+    EXPLANATION_CACHE_MEMORY_ENTRIES = int(os.getenv('EXPLANATION_CACHE_MEMORY_ENTRIES', '2000'))
+    EXPLANATION_CACHE_DISK_ENTRIES = int(os.getenv('EXPLANATION_CACHE_DISK_ENTRIES', '100000'))
+    # Background generation of explanations for likely word clicks when subtitles load
+    VOCAB_PREFETCH_ENABLED = os.getenv('VOCAB_PREFETCH_ENABLED', 'false').lower() == 'true'
+    VOCAB_PREFETCH_TOP_N = int(os.getenv('VOCAB_PREFETCH_TOP_N', '20'))
+    VOCAB_PREFETCH_WORKERS = int(os.getenv('VOCAB_PREFETCH_WORKERS', '2'))
@@ -1,27 +1,111 @@
-from pymongo import MongoClient
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import DuplicateKeyError
 from werkzeug.security import generate_password_hash
 from werkzeug.security import check_password_hash
 import datetime
+import threading
+import time
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+# One pooled client per process; MongoClient is thread-safe and must not be
+# shared across fork(), so it is recreated when the pid changes.
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            # A client inherited from a parent process is not reused
+            _client = MongoClient(
+                os.getenv("MONGODB_URI"),
+                maxPoolSize=int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+                minPoolSize=int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+                serverSelectionTimeoutMS=int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+                connectTimeoutMS=int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+                socketTimeoutMS=int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "10000")),
+                connect=False  # defer connecting until first use, safe for pre-fork servers
+            )
+            _client_pid = pid
+    return _client
+
 def get_db():
-    client = MongoClient(os.getenv("MONGODB_URI"))
-    return client.english_learning
+    return get_client().english_learning
+
+# Short-lived cache of user documents for the Flask-Login user loader, so
+# authenticated requests don't hit MongoDB every time
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+_user_cache = {}  # user_id -> (user_data, expires_at)
+_user_cache_lock = threading.Lock()
+
+def get_user_by_id(user_id):
+    now = time.time()
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+    try:
+        object_id = ObjectId(user_id)
+    except (InvalidId, TypeError):
+        return None
+
+    user_data = get_db().users.find_one({"_id": object_id})
+    if user_data is None:
+        return None
+
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_MAX_SIZE:
+            # Drop expired entries first, then the oldest ones
+            for key in [k for k, (_, expires) in _user_cache.items() if expires <= now]:
+                del _user_cache[key]
+            while len(_user_cache) >= USER_CACHE_MAX_SIZE:
+                del _user_cache[next(iter(_user_cache))]
+        _user_cache[user_id] = (user_data, now + USER_CACHE_TTL)
+    return user_data
+
+def invalidate_user_cache(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(str(user_id), None)
+
+def ensure_indexes():
+    """Create the indexes auth queries rely on (idempotent)."""
+    db = get_db()
+    db.users.create_index([("email", ASCENDING)], unique=True, name="email_unique")
 
 def create_user(email, password):
     db = get_db()
     if db.users.find_one({"email": email}):
         return None  # User exists
-    db.users.insert_one({
-        "email": email,
-        "password_hash": generate_password_hash(password),
-        "created_at": datetime.datetime.now()
-    })
+    try:
+        db.users.insert_one({
+            "email": email,
+            "password_hash": generate_password_hash(password),
+            "created_at": datetime.datetime.now()
+        })
+    except DuplicateKeyError:
+        return None  # Registered concurrently
     return True
 
+def update_password(user_id, new_password):
+    result = get_db().users.update_one(
+        {"_id": ObjectId(user_id)},
+        {"$set": {"password_hash": generate_password_hash(new_password)}}
+    )
+    invalidate_user_cache(user_id)
+    return result.modified_count == 1
+
 def verify_user(email, password):
     try:
         db = get_db()
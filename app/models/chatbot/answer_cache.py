@@ -0,0 +1,100 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Words that usually point back at earlier turns ("why is that?", "explain it again")
+FOLLOW_UP_WORDS = {
+    "it", "its", "that", "this", "those", "these", "they", "them", "their", "he", "him", "his",
+    "she", "her", "above", "previous", "earlier", "again", "else", "said", "mentioned",
+    "elaborate", "continue",
+}
+
+
+def is_history_independent(question, has_history):
+    """True when the question can be answered without the earlier turns."""
+    if not has_history:
+        return True
+    words = re.findall(r"[a-z']+", question.lower())
+    return len(words) >= 3 and not FOLLOW_UP_WORDS.intersection(words)
+
+
+class SemanticAnswerCache:
+    """
+    Per-video cache of chat answers keyed by question meaning.
+
+    A question is embedded with the chat's embedding model and compared (by
+    cosine similarity) with earlier questions about the same video; when one
+    scores at least threshold its answer is served without retrieval or an
+    LLM call. Entries expire after ttl seconds and the least recently used
+    ones are evicted beyond max_entries. The cache is in-process.
+    """
+
+    def __init__(self, embedding, threshold=0.92, ttl=24 * 3600, max_entries=5000):
+        self.embedding = embedding
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # entry id -> (video_id, question, answer, created_at)
+        self._videos = {}  # video_id -> {entry id: unit vector}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _embed(self, question):
+        vector = np.asarray(self.embedding.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self, video_id, question):
+        """Return (answer, vector); answer is None on a miss. Pass vector back to put()."""
+        vector = self._embed(question)
+        now = time.time()
+        with self._lock:
+            candidates = self._videos.get(video_id)
+            best_id = None
+            if candidates:
+                ids = list(candidates)
+                scores = np.stack([candidates[i] for i in ids]) @ vector
+                order = np.argsort(-scores)
+                for position in order:
+                    if scores[position] < self.threshold:
+                        break
+                    entry_id = ids[position]
+                    if now - self._entries[entry_id][3] <= self.ttl:
+                        best_id = entry_id
+                        break
+                    self._remove(entry_id)
+
+            if best_id is None:
+                self.stats["misses"] += 1
+                return None, vector
+            self._entries.move_to_end(best_id)
+            self.stats["hits"] += 1
+            return self._entries[best_id][2], vector
+
+    def put(self, video_id, question, answer, vector=None):
+        if not answer:
+            return
+        if vector is None:
+            vector = self._embed(question)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (video_id, question, answer, time.time())
+            self._videos.setdefault(video_id, {})[entry_id] = vector
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id):
+        video_id = self._entries.pop(entry_id)[0]
+        vectors = self._videos[video_id]
+        del vectors[entry_id]
+        if not vectors:
+            del self._videos[video_id]
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), videos=len(self._videos))
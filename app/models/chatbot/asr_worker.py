@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from app.models.chatbot.transcribe_audio import transcribe_audio
+
+
+class BatchedTranscriber:
+    """
+    Single background worker that owns the Whisper model and transcribes
+    queued clips in micro-batches.
+
+    Callers block in transcribe() while the worker collects up to
+    max_batch_size clips, waiting at most max_wait_ms after the first one,
+    and runs them through one padded model.generate call.
+    """
+
+    def __init__(self, processor, model, max_batch_size=8, max_wait_ms=20, timeout=120, segmenter=None):
+        """
+        segmenter: optional callable turning one clip into a list of segments
+                   (e.g. vad.segment_speech); segments are batched like clips
+        """
+        self.processor = processor
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self.segmenter = segmenter
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name="asr-worker", daemon=True)
+        self._thread.start()
+
+    def _enqueue(self, audio):
+        segments = self.segmenter(audio) if self.segmenter else [audio]
+        futures = []
+        for segment in segments:
+            future = Future()
+            self._queue.put((segment, future))
+            futures.append(future)
+        return futures
+
+    def transcribe(self, audio):
+        """Transcribe one preprocessed 16 kHz clip and return its text."""
+        futures = self._enqueue(audio)
+        if not futures:
+            return ""  # nothing but silence
+
+        try:
+            texts = [future.result(timeout=self.timeout) for future in futures]
+        except TimeoutError:
+            for future in futures:
+                future.cancel()
+            raise
+        return " ".join(text for text in texts if text)
+
+    def submit(self, audio):
+        """Queue one clip without waiting; returns a Future resolving to its text."""
+        futures = self._enqueue(audio)
+        result = Future()
+        result.set_running_or_notify_cancel()
+        if not futures:
+            result.set_result("")
+            return result
+
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def on_segment_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                texts = [future.result() for future in futures]
+            except Exception as e:
+                result.set_exception(e)
+                return
+            result.set_result(" ".join(text for text in texts if text))
+
+        for future in futures:
+            future.add_done_callback(on_segment_done)
+        return result
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect_batch()
+            # Skip callers that already gave up
+            batch = [(audio, future) for audio, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                texts = transcribe_audio([audio for audio, _ in batch], self.processor, self.model)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), text in zip(batch, texts):
+                future.set_result(text.strip())
@@ -1,18 +1,112 @@
-from pydub import AudioSegment
+import io
 import numpy as np
 import torch
+from math import gcd
+
+# Optional in-process decoders; pydub (ffmpeg subprocess) is the fallback
+try:
+    import soundfile as sf
+except ImportError:
+    sf = None
+
+try:
+    import av
+except ImportError:
+    av = None
+
+
+def sniff_format(header):
+    """Guess the container from the first bytes of the file."""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"  # EBML header (WebM / Matroska)
+    return None
+
+
+def _resample(samples, orig_sr, target_sr):
+    if orig_sr == target_sr:
+        return samples
+    from scipy.signal import resample_poly
+    g = gcd(orig_sr, target_sr)
+    return resample_poly(samples, target_sr // g, orig_sr // g).astype(np.float32, copy=False)
+
+
+def _decode_soundfile(data, target_sample_rate):
+    samples, sr = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    return _resample(mono, sr, target_sample_rate)
+
+
+def _decode_av(data, target_sample_rate):
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.audio[0]
+        # libswresample converts to mono float32 at the target rate as frames are decoded
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=target_sample_rate)
+
+        # Preallocate from the container duration when known, growing only if needed
+        seconds = float(stream.duration * stream.time_base) + 1 if stream.duration else 30
+        capacity = int(seconds * target_sample_rate)
+        buffer = np.empty(capacity, dtype=np.float32)
+        length = 0
+
+        def _append(frames):
+            nonlocal buffer, length
+            for frame in frames:
+                chunk = frame.to_ndarray().reshape(-1)
+                if length + len(chunk) > len(buffer):
+                    buffer = np.resize(buffer, max(len(buffer) * 2, length + len(chunk)))
+                buffer[length:length + len(chunk)] = chunk
+                length += len(chunk)
+
+        for frame in container.decode(stream):
+            _append(resampler.resample(frame))
+        _append(resampler.resample(None))  # flush
+
+    return buffer[:length]
+
+
+def _decode_pydub(data, fmt, target_sample_rate):
+    from pydub import AudioSegment
+    audio = AudioSegment.from_file(io.BytesIO(data), format=fmt or "webm")
+    audio = audio.set_frame_rate(target_sample_rate).set_channels(1).set_sample_width(2)
+    return np.frombuffer(audio.raw_data, dtype=np.int16).astype(np.float32) / 32768.0
+
+
 def preprocess_audio(audio_io, target_sample_rate=16000):
     """
-    Preprocess audio for Whisper. Truncates audio longer than max_duration.
-    
+    Preprocess audio for Whisper: decode, downmix to mono and resample in-process.
+
     Parameters:
-        audio_path (str): Path to the audio file.
+        audio_io (file-like or str): Audio file object or path (wav/ogg/flac/webm, sniffed from the header).
         target_sample_rate (int): Sampling rate for the model.
-    
+
     Returns:
-        array: Preprocessed audio as a array.
+        torch.Tensor: float32 mono samples, sharing memory with the decoded buffer.
     """
-    audio = AudioSegment.from_file(audio_io, format="webm")
-    audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-    samples = np.array(audio.get_array_of_samples()).astype(np.float32) / 32768.0
-    return torch.tensor(samples)
+    if isinstance(audio_io, str):
+        with open(audio_io, "rb") as f:
+            data = f.read()
+    else:
+        data = audio_io.read()
+
+    fmt = sniff_format(data[:12])
+
+    if sf is not None and fmt in ("wav", "ogg", "flac"):
+        try:
+            samples = _decode_soundfile(data, target_sample_rate)
+        except RuntimeError:
+            samples = None  # e.g. a codec this libsndfile build lacks
+    else:
+        samples = None
+
+    if samples is None and av is not None:
+        samples = _decode_av(data, target_sample_rate)
+    elif samples is None:
+        samples = _decode_pydub(data, fmt, target_sample_rate)
+
+    return torch.from_numpy(np.ascontiguousarray(samples, dtype=np.float32))
@@ -0,0 +1,159 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model so each unique text is embedded only once.
+
+    Vectors are keyed by a hash of (model name, text) and kept in an
+    in-memory LRU. Document vectors are also stored in a SQLite table of raw
+    float16/float32 bytes, capped at max_disk_entries (least recently used
+    rows are evicted); query vectors stay in memory only, since every learner
+    question would otherwise grow the file. Misses from one embed_documents
+    call are embedded in a single batch.
+    """
+
+    def __init__(self, embedding, model_name, db_path, max_memory_entries=50000, dtype="float32",
+                 max_disk_entries=500000):
+        self.embedding = embedding
+        self.model_name = model_name
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.dtype = np.dtype(dtype)
+        self._memory = OrderedDict()  # key -> list[float]
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dtype TEXT, vector BLOB, last_access REAL)"
+            )
+            # Tables created before eviction existed have no last_access column
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(embeddings)")]
+            if "last_access" not in columns:
+                conn.execute("ALTER TABLE embeddings ADD COLUMN last_access REAL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _key(self, text, kind="doc"):
+        # Queries use a separate key space: some models embed queries differently
+        return hashlib.sha256(f"{self.model_name}\x00{kind}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys, use_disk=True):
+        """Return {key: vector} for every key found in memory (or on disk, if use_disk)."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+        missing = [k for k in keys if k not in found]
+        if missing and use_disk:
+            try:
+                with self._connect() as conn:
+                    # Stay under SQLite's bound-parameter limit
+                    for i in range(0, len(missing), 500):
+                        batch = missing[i:i + 500]
+                        rows = conn.execute(
+                            f"SELECT key, dtype, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                            batch
+                        ).fetchall()
+                        for key, dtype, blob in rows:
+                            found[key] = np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+                        hit_keys = [row[0] for row in rows]
+                        if hit_keys:
+                            conn.execute(
+                                f"UPDATE embeddings SET last_access = ? WHERE key IN ({','.join('?' * len(hit_keys))})",
+                                [time.time(), *hit_keys]
+                            )
+            except sqlite3.Error as e:
+                print(f"Embedding cache read failed: {e}")
+
+            with self._lock:
+                for key in missing:
+                    if key in found:
+                        self._remember(key, found[key])
+        return found
+
+    def _store(self, items, persist=True):
+        with self._lock:
+            for key, vector in items:
+                self._remember(key, vector)
+        if not persist:
+            return
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dtype, vector, last_access) VALUES (?, ?, ?, ?)",
+                    [
+                        (key, self.dtype.name, np.asarray(vector, dtype=self.dtype).tobytes(), now)
+                        for key, vector in items
+                    ]
+                )
+                self._evict_disk(conn)
+        except sqlite3.Error as e:
+            print(f"Embedding cache write failed: {e}")
+
+    def _evict_disk(self, conn):
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count > self.max_disk_entries:
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                " SELECT key FROM embeddings ORDER BY last_access LIMIT ?)",
+                (count - self.max_disk_entries,)
+            )
+
+    def embed_documents(self, texts):
+        keys = [self._key(t) for t in texts]
+        found = self._lookup(list(dict.fromkeys(keys)))
+
+        # Embed each distinct missing text once, in one batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.embedding.embed_documents(list(missing.values()))
+            new_items = list(zip(missing.keys(), vectors))
+            self._store(new_items)
+            found.update(new_items)
+
+        with self._lock:
+            self.stats["hits"] += len(texts) - len(missing)
+            self.stats["misses"] += len(missing)
+        return [list(found[key]) for key in keys]
+
+    def embed_query(self, text):
+        key = self._key(text, kind="query")
+        found = self._lookup([key], use_disk=False)
+        if key in found:
+            with self._lock:
+                self.stats["hits"] += 1
+            return list(found[key])
+
+        vector = self.embedding.embed_query(text)
+        self._store([(key, vector)], persist=False)
+        with self._lock:
+            self.stats["misses"] += 1
+        return vector
@@ -1,32 +1,50 @@
 # app/models/chatbot/chat_handler.py
 
 import os
-from typing import List
+from typing import Iterator, List
 
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import SystemMessage
 from langchain_core.documents import Document
 
+from app.models.chatbot.chat_history import ChatHistory
+from app.models.chatbot.llm_metrics import llm_metrics
+from app.models.chatbot.answer_cache import is_history_independent
+from app.models.chatbot.retrieval import ContextRetriever
+
 # NOTE: this file does NOT import langchain.chains or langchain_community.chains
 
 class ChatHandler:
-    def __init__(self, llm, vector_store, max_docs: int = 6):
+    def __init__(self, llm, vector_store, max_docs: int = 6, history: ChatHistory = None, video_context: str = "",
+                 answer_cache=None, video_id: str = None, retriever: ContextRetriever = None):
         """
         llm: a runnable-like or callable LLM object. Examples:
              - langchain.llms.OpenAI() (Runnable) -> has .invoke()
              - any simple callable that takes a string and returns a string
-        vector_store: an object with .as_retriever() returning a Retriever with get_relevant_documents(query)
+        vector_store: the video's FAISS vector store
         max_docs: how many retrieved docs to include in the context
+        history: bounded conversation memory; defaults to a ChatHistory that summarizes inline
+        video_context: short description of the video, placed in the system message
+        answer_cache: optional SemanticAnswerCache shared by all chats; needs video_id
+        retriever: retrieval stage; defaults to a ContextRetriever over vector_store
         """
         self.llm = llm
         self.vector_store = vector_store
-        self.retriever = self.vector_store.as_retriever()
+        self.retriever = retriever or ContextRetriever(vector_store, llm)
         self.max_docs = max_docs
-        self.chat_history: List = []  # list of HumanMessage / AIMessage
+        self.history = history or ChatHistory(llm)
+        self.answer_cache = answer_cache
+        self.video_id = video_id
         # a system message you can customize as needed
-        self.system_message = SystemMessage(content="You are a helpful assistant. Use the provided context to answer user questions.")
-
-        # Build a prompt template that expects {context} and {input}.
+        system_content = "You are a helpful assistant. Use the provided context to answer user questions."
+        if video_context:
+            system_content += f"\n\nAbout the video:\n{video_context}"
+        self.system_message = SystemMessage(content=system_content)
+
+        # Layout for Ollama's prompt cache: the parts that stay the same between
+        # turns (system message + video context, then history) come first and the
+        # turn-specific retrieved context comes last, so a follow-up only has to
+        # evaluate the tokens after the previous turn's prefix.
         # MessagesPlaceholder will be filled with the conversation history when formatting.
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", "{system_message}"),
@@ -34,6 +52,15 @@ class ChatHandler:
             ("user", "Context:\n{context}\n\nQuestion: {input}")
         ])
 
+    @property
+    def chat_history(self) -> List:
+        # Summary (if any) + recent turns, as sent to the LLM and persisted by the session store
+        return self.history.to_messages()
+
+    @chat_history.setter
+    def chat_history(self, messages: List):
+        self.history.load(messages)
+
     def _format_context(self, docs: List[Document]) -> str:
         # Create a compact combined context. You can instead render titles/metadata if you want.
         pieces = []
@@ -41,22 +68,28 @@ class ChatHandler:
             # include small separator and optional metadata
             meta = getattr(d, "metadata", {}) or {}
             source = meta.get("source") or meta.get("id") or f"doc-{i+1}"
+            if meta.get("start") is not None:
+                minutes, seconds = divmod(int(meta["start"]), 60)
+                source = f"{meta.get('video_id') or source} @ {minutes}:{seconds:02d}"
             pieces.append(f"--- Document {i+1} (source: {source}) ---\n{d.page_content.strip()}")
         return "\n\n".join(pieces) if pieces else "No context found."
 
     def _call_llm(self, messages):
         """
         Call the LLM in a robust way:
-        - If llm has .invoke, call llm.invoke({"messages": messages})
+        - If llm has .invoke, call llm.invoke(messages) and record Ollama's timings
         - else if it's callable, call llm(messages)
         - else if it has .generate, call .generate(...) and extract text
         Returns a plain answer string.
         """
         # Case 1: Runnable-like LLM (LCEL)
         if hasattr(self.llm, "invoke"):
-            # many Runnable LLMs accept a dict payload — we pass messages
-            out = self.llm.invoke({"messages": messages})
+            # Chat models accept the message list directly
+            out = self.llm.invoke(messages)
             # The exact return shape can differ: attempt to unwrap plausibly
+            if hasattr(out, "content"):
+                llm_metrics.record(getattr(out, "response_metadata", None))
+                return out.content
             if isinstance(out, dict):
                 # common keys: "output", "text", "answer", "result"
                 for k in ("output", "text", "answer", "result"):
@@ -97,10 +130,11 @@ class ChatHandler:
 
         raise RuntimeError("Unsupported LLM object: please pass a Runnable-like or callable LLM.")
 
-    def process_chat(self, user_input: str) -> str:
-        # 1. Retrieve documents relevant to the user's current input AND optionally the chat history
-        # For conversation-aware retrieval you can alter query to include last user message(s).
-        docs = self.retriever.get_relevant_documents(user_input)
+    def _build_messages(self, user_input: str):
+        # 1. Retrieve documents relevant to the user's current input; follow-up
+        # questions are rewritten with the chat history first
+        chat_history = self.chat_history
+        docs = self.retriever.retrieve(user_input, chat_history)
 
         # 2. Build the combined context text
         context_text = self._format_context(docs)
@@ -108,19 +142,81 @@ class ChatHandler:
         # 3. Format messages using the ChatPromptTemplate and include chat history
         # The ChatPromptTemplate expects the "chat_history" placeholder to be a list of messages
         # Use a string for system_message (we inserted a placeholder "{system_message}")
-        raw_messages = self.prompt.format_messages({
-            "system_message": self.system_message.content,
-            "chat_history": self.chat_history,
-            "context": context_text,
-            "input": user_input
-        })
+        return self.prompt.format_messages(
+            system_message=self.system_message.content,
+            chat_history=chat_history,
+            context=context_text,
+            input=user_input
+        )
+
+    def _lookup_answer(self, user_input: str):
+        """
+        Return (cached answer or None, question vector). The vector is None when
+        the question must not be cached (no cache, or it refers to earlier turns).
+        """
+        if self.answer_cache is None or self.video_id is None:
+            return None, None
+        if not is_history_independent(user_input, not self.history.is_empty()):
+            return None, None
+        return self.answer_cache.get(self.video_id, user_input)
+
+    def _store_answer(self, user_input: str, answer: str, vector):
+        if vector is not None and answer and not answer.startswith("Error:"):
+            self.answer_cache.put(self.video_id, user_input, answer, vector)
+
+    def process_chat(self, user_input: str) -> str:
+        cached, vector = self._lookup_answer(user_input)
+        if cached is not None:
+            self._append_turn(user_input, cached)
+            return cached
+
+        raw_messages = self._build_messages(user_input)
 
         # raw_messages is a list of Message objects (SystemMessage/HumanMessage/AIMessage).
         # 4. Call the LLM with these messages
         answer = self._call_llm(raw_messages)
 
         # 5. Update chat history
-        self.chat_history.append(HumanMessage(content=user_input))
-        self.chat_history.append(AIMessage(content=answer))
+        self._append_turn(user_input, answer)
+        self._store_answer(user_input, answer, vector)
 
         return answer
+
+    def stream_chat(self, user_input: str) -> Iterator[str]:
+        """
+        Same as process_chat but yields the answer piece by piece as the LLM
+        produces it. The full answer is added to the history once streaming ends.
+        LLMs without .stream() and cached answers yield the whole answer as a single piece.
+        """
+        cached, vector = self._lookup_answer(user_input)
+        if cached is not None:
+            self._append_turn(user_input, cached)
+            yield cached
+            return
+
+        raw_messages = self._build_messages(user_input)
+
+        if not hasattr(self.llm, "stream"):
+            answer = self._call_llm(raw_messages)
+            self._append_turn(user_input, answer)
+            self._store_answer(user_input, answer, vector)
+            yield answer
+            return
+
+        pieces = []
+        for chunk in self.llm.stream(raw_messages):
+            # Ollama reports its timings on the final chunk
+            llm_metrics.record(getattr(chunk, "response_metadata", None))
+            text = getattr(chunk, "content", chunk)
+            if not isinstance(text, str):
+                text = str(text)
+            if text:
+                pieces.append(text)
+                yield text
+
+        answer = "".join(pieces)
+        self._append_turn(user_input, answer)
+        self._store_answer(user_input, answer, vector)
+
+    def _append_turn(self, user_input: str, answer: str):
+        self.history.add_turn(user_input, answer)
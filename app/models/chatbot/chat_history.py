@@ -0,0 +1,146 @@
+import threading
+
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+SUMMARY_PROMPT = """You keep a running summary of a tutoring conversation about a video.
+Update the summary with the new turns below. Keep what the learner asked, what they
+struggled with and the key facts from the answers. Use at most {max_words} words.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:"""
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class ChatHistory:
+    """
+    Bounded conversation memory for one chat session.
+
+    Up to keep_turns turns are kept verbatim; once there are more, older
+    turns are folded into a running summary by the LLM on a background
+    executor, so the request that pushed the history over its limits never
+    waits for the summary. Folding goes down to fold_to_turns in one block, so
+    the summary and the oldest verbatim turns (the start of the prompt Ollama
+    can reuse from its cache) stay unchanged for several turns in between.
+    The messages returned by to_messages() never exceed max_tokens: while a
+    summary is still pending the oldest verbatim turns are left out.
+    """
+
+    def __init__(self, llm, executor=None, keep_turns=4, max_tokens=1200, summary_max_words=150,
+                 count_tokens=count_words, fold_to_turns=None):
+        """
+        executor: runs summarization off the request path; None summarizes inline
+        max_tokens: budget for summary + verbatim turns (default counter: words)
+        fold_to_turns: verbatim turns left after a fold (default: keep_turns // 2, at least 1)
+        """
+        self.llm = llm
+        self.executor = executor
+        self.keep_turns = keep_turns
+        self.fold_to_turns = max(fold_to_turns if fold_to_turns is not None else keep_turns // 2, 1)
+        self.max_tokens = max_tokens
+        self.summary_max_words = summary_max_words
+        self.count_tokens = count_tokens
+        self.summary = ""
+        self.messages = []  # verbatim HumanMessage / AIMessage pairs, oldest first
+        self._version = 0  # bumped by load() so stale summaries are discarded
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def add_turn(self, user_input, answer):
+        with self._lock:
+            self.messages.append(HumanMessage(content=user_input))
+            self.messages.append(AIMessage(content=answer))
+            if self._pending or not self._overflow_count():
+                return
+            self._pending = True
+
+        if self.executor is None:
+            self._summarize()
+        else:
+            self.executor.submit(self._summarize)
+
+    def _tokens(self, messages):
+        return sum(self.count_tokens(m.content) for m in messages)
+
+    def _overflow_count(self):
+        """Number of oldest verbatim messages that should be folded into the summary."""
+        budget = self.max_tokens - self.count_tokens(self.summary)
+        if len(self.messages) <= 2 * self.keep_turns and self._tokens(self.messages) <= budget:
+            return 0
+        # Fold a whole block at once, so the prompt prefix survives the next few turns
+        overflow = max(len(self.messages) - 2 * self.fold_to_turns, 0)
+        # Fold more turns while over budget, but always keep the latest turn
+        while overflow < len(self.messages) - 2 and self._tokens(self.messages[overflow:]) > budget:
+            overflow += 2
+        return overflow
+
+    def _summarize(self):
+        with self._lock:
+            overflow = self._overflow_count()
+            folded = self.messages[:overflow]
+            summary = self.summary
+            version = self._version
+
+        new_summary = summary
+        if folded:
+            try:
+                new_summary = self._call_llm(summary, folded)
+            except Exception as e:
+                # Stay bounded even when the LLM is unavailable: the folded turns are dropped
+                print(f"Chat history summarization failed: {e}")
+
+        with self._lock:
+            self._pending = False
+            if version != self._version:
+                return
+            self.summary = new_summary
+            del self.messages[:len(folded)]
+
+    def _call_llm(self, summary, folded):
+        turns = "\n".join(
+            f"{'Learner' if isinstance(m, HumanMessage) else 'Assistant'}: {m.content}" for m in folded
+        )
+        prompt = SUMMARY_PROMPT.format(
+            max_words=self.summary_max_words,
+            summary=summary or "(none yet)",
+            turns=turns
+        )
+        out = self.llm.invoke(prompt)
+        return str(getattr(out, "content", out)).strip()
+
+    def to_messages(self):
+        """Summary (as a system message) followed by the verbatim turns that fit the token budget."""
+        with self._lock:
+            summary = self.summary
+            messages = list(self.messages)
+
+        budget = self.max_tokens - self.count_tokens(summary)
+        start = 0
+        while start < len(messages) - 2 and self._tokens(messages[start:]) > budget:
+            start += 2
+        prefix = [SystemMessage(content=SUMMARY_PREFIX + summary)] if summary else []
+        return prefix + messages[start:]
+
+    def is_empty(self):
+        with self._lock:
+            return not self.messages and not self.summary
+
+    def load(self, messages):
+        """Restore from to_messages() output, e.g. a persisted session."""
+        summary = ""
+        if messages and isinstance(messages[0], SystemMessage) and messages[0].content.startswith(SUMMARY_PREFIX):
+            summary = messages[0].content[len(SUMMARY_PREFIX):]
+            messages = messages[1:]
+        with self._lock:
+            self.summary = summary
+            self.messages = list(messages)
+            self._version += 1
@@ -4,10 +4,101 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    OLLAMA_BASE_URL = "http://localhost:11434"
+    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     LANGCHAIN_TRACING_V2 = os.getenv("LANGCHAIN_TRACING_V2", "true")
     LANGCHAIN_ENDPOINT = os.getenv("LANGCHAIN_ENDPOINT", "https://api.smith.langchain.com")
     LANGCHAIN_PROJECT = os.getenv("LANGCHAIN_PROJECT", "default")
-    EMBEDDING_MODEL = "sentence-transformers/all-mpnet-base-v2"
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-mpnet-base-v2")
     LLM_MODEL = "gemma3:4b"
-    LLM_TEMPERATURE = 0.7
\ No newline at end of file
+    LLM_TEMPERATURE = 0.7
+    # Ollama runtime options sent with every LLM request: a fixed 4096-token context window and
+    # Ollama's own thread count by default; 0 leaves an option out so Ollama's default applies
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+    OLLAMA_NUM_THREAD = int(os.getenv("OLLAMA_NUM_THREAD", "0"))
+    # Shared LLM gateway: per-read timeout, retries, pooled connections, concurrent requests per
+    # lane (interactive chat, word explanations, background QA/summaries/prefetch) and how many
+    # requests may wait per lane before new ones are rejected
+    LLM_GATEWAY_TIMEOUT_SECONDS = float(os.getenv("LLM_GATEWAY_TIMEOUT_SECONDS", "120"))
+    LLM_GATEWAY_MAX_RETRIES = int(os.getenv("LLM_GATEWAY_MAX_RETRIES", "2"))
+    LLM_GATEWAY_MAX_CONNECTIONS = int(os.getenv("LLM_GATEWAY_MAX_CONNECTIONS", "16"))
+    LLM_GATEWAY_CHAT_CONCURRENCY = int(os.getenv("LLM_GATEWAY_CHAT_CONCURRENCY", "4"))
+    LLM_GATEWAY_EXPLAIN_CONCURRENCY = int(os.getenv("LLM_GATEWAY_EXPLAIN_CONCURRENCY", "2"))
+    LLM_GATEWAY_BACKGROUND_CONCURRENCY = int(os.getenv("LLM_GATEWAY_BACKGROUND_CONCURRENCY", "2"))
+    LLM_GATEWAY_MAX_QUEUE = int(os.getenv("LLM_GATEWAY_MAX_QUEUE", "32"))
+    # Words from the start of the transcript placed in the chat system message
+    CHAT_VIDEO_CONTEXT_WORDS = int(os.getenv("CHAT_VIDEO_CONTEXT_WORDS", "120"))
+    # Load Whisper/embeddings/LLM in a background thread when the app starts
+    # instead of on the first request that needs them
+    WARMUP_MODELS = os.getenv("WARMUP_MODELS", "false").lower() == "true"
+    # Per-video FAISS index cache budgets
+    INDEX_CACHE_MAX_DISK_MB = int(os.getenv("INDEX_CACHE_MAX_DISK_MB", "1024"))
+    INDEX_CACHE_MAX_MEMORY_MB = int(os.getenv("INDEX_CACHE_MAX_MEMORY_MB", "256"))
+    # Per-user chat sessions; set CHAT_SESSION_DIR to share them between worker processes
+    CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", "500"))
+    CHAT_SESSION_TTL_SECONDS = int(os.getenv("CHAT_SESSION_TTL_SECONDS", "3600"))
+    CHAT_SESSION_DIR = os.getenv("CHAT_SESSION_DIR")
+    # Chat memory: recent turns kept verbatim, older ones folded into a background LLM summary
+    CHAT_HISTORY_KEEP_TURNS = int(os.getenv("CHAT_HISTORY_KEEP_TURNS", "4"))
+    CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "1200"))
+    CHAT_SUMMARY_MAX_WORDS = int(os.getenv("CHAT_SUMMARY_MAX_WORDS", "150"))
+    CHAT_SUMMARY_WORKERS = int(os.getenv("CHAT_SUMMARY_WORKERS", "1"))
+    # Chat retrieval: "similarity" or "mmr" search, cosine cutoff, token budget for retrieved chunks,
+    # and how follow-up questions are rewritten for search ("none", "concat" or "llm")
+    RETRIEVAL_SEARCH_TYPE = os.getenv("RETRIEVAL_SEARCH_TYPE", "mmr")
+    RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "4"))
+    RETRIEVAL_FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", "20"))
+    RETRIEVAL_MMR_LAMBDA = float(os.getenv("RETRIEVAL_MMR_LAMBDA", "0.5"))
+    RETRIEVAL_MIN_SIMILARITY = float(os.getenv("RETRIEVAL_MIN_SIMILARITY", "0.25"))
+    RETRIEVAL_MAX_CONTEXT_TOKENS = int(os.getenv("RETRIEVAL_MAX_CONTEXT_TOKENS", "800"))
+    RETRIEVAL_QUERY_REWRITE = os.getenv("RETRIEVAL_QUERY_REWRITE", "concat")
+    # Semantic answer cache: reuse answers to near-identical questions about the same video
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+    ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+    # Concurrent QA-pair generation (Ollama also needs OLLAMA_NUM_PARALLEL > 1)
+    QA_MAX_WORKERS = int(os.getenv("QA_MAX_WORKERS", "4"))
+    QA_CHUNK_TIMEOUT_SECONDS = float(os.getenv("QA_CHUNK_TIMEOUT_SECONDS", "120"))
+    # Background transcript-ingestion jobs
+    INGESTION_MAX_WORKERS = int(os.getenv("INGESTION_MAX_WORKERS", "2"))
+    INGESTION_JOB_TTL_SECONDS = int(os.getenv("INGESTION_JOB_TTL_SECONDS", "3600"))
+    # Micro-batching of concurrent Whisper requests
+    ASR_MAX_BATCH_SIZE = int(os.getenv("ASR_MAX_BATCH_SIZE", "8"))
+    ASR_MAX_WAIT_MS = int(os.getenv("ASR_MAX_WAIT_MS", "20"))
+    ASR_TIMEOUT_SECONDS = float(os.getenv("ASR_TIMEOUT_SECONDS", "120"))
+    # Whisper CPU inference: backend is "fp32", "int8" or "onnx"; 0 threads keeps torch's default
+    WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "fp32")
+    WHISPER_NUM_THREADS = int(os.getenv("WHISPER_NUM_THREADS", "0"))
+    WHISPER_INTEROP_THREADS = int(os.getenv("WHISPER_INTEROP_THREADS", "0"))
+    # Local Whisper snapshots written by model_download.py; the Hub is used when they are incomplete
+    WHISPER_MODEL_DIR = os.getenv("WHISPER_MODEL_DIR", os.path.join(os.getcwd(), "model"))
+    WHISPER_PROCESSOR_DIR = os.getenv("WHISPER_PROCESSOR_DIR", os.path.join(os.getcwd(), "processor"))
+    # Silence trimming and splitting of long clips before Whisper
+    ASR_VAD_ENABLED = os.getenv("ASR_VAD_ENABLED", "true").lower() == "true"
+    ASR_MAX_SEGMENT_SECONDS = float(os.getenv("ASR_MAX_SEGMENT_SECONDS", "28"))
+    ASR_VAD_DYNAMIC_RANGE_DB = float(os.getenv("ASR_VAD_DYNAMIC_RANGE_DB", "35"))
+    # Streaming microphone transcription: seconds of new audio between interim transcripts, and
+    # the shortest segment / pause after which finished speech is committed
+    ASR_PARTIAL_INTERVAL_SECONDS = float(os.getenv("ASR_PARTIAL_INTERVAL_SECONDS", "1.0"))
+    ASR_STREAM_MIN_SEGMENT_SECONDS = float(os.getenv("ASR_STREAM_MIN_SEGMENT_SECONDS", "2.0"))
+    ASR_STREAM_PAUSE_MS = int(os.getenv("ASR_STREAM_PAUSE_MS", "500"))
+    # Content-hash cache of chunk/query embeddings (only chunk vectors go to disk); float16 halves the disk size
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(os.getcwd(), "embedding_vectors", "embeddings.sqlite3"))
+    EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "50000"))
+    EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+    EMBEDDING_CACHE_MAX_DISK_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_DISK_ENTRIES", "500000"))
+    # Embedder runtime ("torch", "onnx", "openvino"), optional quantized ONNX file inside the
+    # model repo, encode batch size, and FAISS vector precision ("float32", "float16", "int8")
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+    EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "float32")
+    # Transcript chunking: overlapping windows measured in tokens (whitespace-separated words)
+    TRANSCRIPT_CHUNK_TOKENS = int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", "200"))
+    TRANSCRIPT_CHUNK_OVERLAP_TOKENS = int(os.getenv("TRANSCRIPT_CHUNK_OVERLAP_TOKENS", "40"))
+    # Single cross-video HNSW index of every processed chunk (video ID, start, duration)
+    GLOBAL_INDEX_ENABLED = os.getenv("GLOBAL_INDEX_ENABLED", "true").lower() == "true"
+    GLOBAL_INDEX_DIR = os.getenv("GLOBAL_INDEX_DIR", os.path.join(os.getcwd(), "global_index"))
+    GLOBAL_INDEX_HNSW_M = int(os.getenv("GLOBAL_INDEX_HNSW_M", "32"))
+    GLOBAL_INDEX_EF_SEARCH = int(os.getenv("GLOBAL_INDEX_EF_SEARCH", "128"))
@@ -0,0 +1,104 @@
+"""
+Benchmark embedding backends against the current model on sample transcripts.
+
+Reports embedding throughput (docs/sec) and recall@k of each candidate's
+retrieval against the baseline's top-k. Queries are short word windows
+sampled from the chunks, so no labelled data is needed.
+
+Usage (from the project root):
+    python -m app.models.chatbot.embedding_benchmark \\
+        --url "https://www.youtube.com/watch?v=..." \\
+        --candidate sentence-transformers/all-MiniLM-L6-v2 \\
+        --candidate sentence-transformers/all-MiniLM-L6-v2:onnx:onnx/model_qint8_avx2.onnx
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.models.chatbot.config import Config
+from app.models.chatbot.transcript_processor import TranscriptProcessor
+from app.models.chatbot.vector_store import build_embedder
+
+
+def load_chunks(urls, text_files):
+    chunks = []
+    processor = TranscriptProcessor()
+    for url in urls:
+        df = processor.get_transcript(url)
+        if df is not None:
+            chunks.extend(df["text"].tolist())
+    for path in text_files:
+        with open(path, encoding="utf-8") as f:
+            words = f.read().split()
+        # ~300-word chunks, roughly a two-minute transcript chunk
+        chunks.extend(" ".join(words[i:i + 300]) for i in range(0, len(words), 300))
+    return [c.strip() for c in chunks if c.strip()]
+
+
+def sample_queries(chunks, n, words=12, seed=0):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        tokens = rng.choice(chunks).split()
+        start = rng.randrange(max(len(tokens) - words, 1))
+        queries.append(" ".join(tokens[start:start + words]))
+    return queries
+
+
+def parse_spec(spec):
+    """model[:backend[:onnx_file]]"""
+    parts = spec.split(":", 2)
+    return parts[0], (parts[1] if len(parts) > 1 else "torch"), (parts[2] if len(parts) > 2 else None)
+
+
+def evaluate(spec, chunks, queries, k, batch_size):
+    model, backend, onnx_file = parse_spec(spec)
+    embedder = build_embedder(model, backend, batch_size, onnx_file)
+    embedder.embed_documents(chunks[:2])  # warm-up
+
+    start = time.perf_counter()
+    doc_vectors = np.asarray(embedder.embed_documents(chunks), dtype=np.float32)
+    docs_per_sec = len(chunks) / (time.perf_counter() - start)
+
+    query_vectors = np.asarray(embedder.embed_documents(queries), dtype=np.float32)
+    # L2 distance, matching the FAISS flat index
+    distances = (
+        (query_vectors ** 2).sum(1)[:, None]
+        - 2 * query_vectors @ doc_vectors.T
+        + (doc_vectors ** 2).sum(1)[None, :]
+    )
+    top_k = np.argsort(distances, axis=1)[:, :k]
+    return docs_per_sec, top_k, doc_vectors.shape[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", action="append", default=[], help="YouTube URL to use as sample transcript")
+    parser.add_argument("--text-file", action="append", default=[], help="Plain-text transcript file")
+    parser.add_argument("--baseline", default=Config.EMBEDDING_MODEL)
+    parser.add_argument("--candidate", action="append", default=[], help="model[:backend[:onnx_file]]")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=Config.EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.url, args.text_file)
+    if len(chunks) <= args.k:
+        raise SystemExit("Need more sample chunks than k; pass --url or --text-file")
+    queries = sample_queries(chunks, args.queries)
+
+    baseline_rate, baseline_top_k, baseline_dim = evaluate(args.baseline, chunks, queries, args.k, args.batch_size)
+    print(f"{len(chunks)} chunks, {len(queries)} queries, recall@{args.k} vs {args.baseline}\n")
+    print(f"{'model':70} {'dim':>5} {'docs/sec':>10} {'recall':>8}")
+    print(f"{args.baseline:70} {baseline_dim:>5} {baseline_rate:>10.1f} {1.0:>8.3f}")
+
+    for spec in args.candidate:
+        rate, top_k, dim = evaluate(spec, chunks, queries, args.k, args.batch_size)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(top_k, baseline_top_k)])
+        print(f"{spec:70} {dim:>5} {rate:>10.1f} {recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+TIMING_KEYS = (
+    "total_duration", "load_duration", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration"
+)
+
+
+class GatewayChatModel(BaseChatModel):
+    """
+    LangChain chat model backed by the shared LLMGateway, so chains, QA
+    generation and chat streaming use the same pooled Ollama client and
+    concurrency limits as the rest of the app. Ollama's timings are returned
+    in response_metadata like ChatOllama does.
+    """
+
+    gateway: Any
+    model: str
+    temperature: Optional[float] = None
+    lane: str = "chat"
+    # Limit per call once it has a lane slot; None leaves only the gateway's read timeout
+    request_timeout: Optional[float] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-gateway"
+
+    def _options(self, stop):
+        options = {}
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        if stop:
+            options["stop"] = stop
+        return options
+
+    @staticmethod
+    def _to_ollama(messages: List[BaseMessage]):
+        return [{"role": ROLES.get(m.type, "user"), "content": m.content} for m in messages]
+
+    def _metadata(self, response):
+        return {"model": self.model, **{k: response[k] for k in TIMING_KEYS if k in response}}
+
+    def _result(self, response):
+        message = AIMessage(content=self.gateway.content(response), response_metadata=self._metadata(response))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        response = self.gateway.chat(
+            self._to_ollama(messages), self.model, self._options(stop), self.lane, self.request_timeout
+        )
+        return self._result(response)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        response = await self.gateway.achat(
+            self._to_ollama(messages), self.model, self._options(stop), self.lane, self.request_timeout
+        )
+        return self._result(response)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for part in self.gateway.stream_chat(self._to_ollama(messages), self.model, self._options(stop), self.lane):
+            text = self.gateway.content(part)
+            metadata = self._metadata(part) if part.get("done") else {}
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text, response_metadata=metadata))
+            if run_manager and text:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
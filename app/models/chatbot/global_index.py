@@ -0,0 +1,178 @@
+import fcntl
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+
+class GlobalVectorIndex:
+    """
+    One persistent HNSW index over the transcript chunks of every processed
+    video, with chunk metadata (video ID, start time, duration, text) and
+    user -> watched-video links kept in SQLite.
+
+    FAISS row ids are assigned sequentially and double as the chunk ids in
+    SQLite. Searches can be restricted to one video or to the videos a user
+    has watched. Writers from several worker processes are serialized with a
+    file lock and readers reload the index when another process changed it.
+    """
+
+    def __init__(self, index_dir, embedding, hnsw_m=32, ef_search=128, exact_search_limit=4096):
+        """
+        exact_search_limit: filtered searches over at most this many chunks are
+                            answered by brute force instead of a filtered HNSW walk
+        """
+        self.embedding = embedding
+        self.index_dir = index_dir
+        self.index_path = os.path.join(index_dir, "chunks.faiss")
+        self.db_path = os.path.join(index_dir, "chunks.sqlite3")
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+        self.exact_search_limit = exact_search_limit
+        self.index = None
+        self._index_mtime = None
+        self._lock = threading.RLock()
+        os.makedirs(index_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " id INTEGER PRIMARY KEY, video_id TEXT, start REAL, duration REAL, text TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_video ON chunks(video_id)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_videos ("
+                " user_key TEXT, video_id TEXT, PRIMARY KEY (user_key, video_id))"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @contextmanager
+    def _write_lock(self):
+        with open(os.path.join(self.index_dir, ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """(Re)load the index from disk if another process wrote a newer one."""
+        try:
+            mtime = os.path.getmtime(self.index_path)
+        except OSError:
+            return
+        if self.index is None or mtime != self._index_mtime:
+            self.index = faiss.read_index(self.index_path)
+            self.index.hnsw.efSearch = self.ef_search
+            self._index_mtime = mtime
+
+    def _reload(self):
+        self.index = None
+        self._index_mtime = None
+        self._refresh()
+
+    def has_video(self, video_id):
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM chunks WHERE video_id = ? LIMIT 1", (video_id,)).fetchone() is not None
+
+    def add_video(self, video_id, docs, embeddings):
+        """Add a video's chunks (Documents with start/duration metadata) and their vectors."""
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._lock, self._write_lock():
+            if self.has_video(video_id):
+                return
+            self._refresh()
+            if self.index is None:
+                self.index = faiss.IndexHNSWFlat(vectors.shape[1], self.hnsw_m)
+                self.index.hnsw.efSearch = self.ef_search
+
+            first_id = self.index.ntotal
+            try:
+                with self._connect() as conn:
+                    conn.executemany(
+                        "INSERT INTO chunks (id, video_id, start, duration, text) VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (first_id + i, video_id, d.metadata.get("start"), d.metadata.get("duration"), d.page_content)
+                            for i, d in enumerate(docs)
+                        ]
+                    )
+                    # Write the index before committing so chunk rows never point past it
+                    self.index.add(vectors)
+                    tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                    faiss.write_index(self.index, tmp_path)
+                    os.replace(tmp_path, self.index_path)
+            except Exception:
+                # The rows were rolled back; drop any vectors added in memory by reloading from disk
+                self._reload()
+                raise
+            self._index_mtime = os.path.getmtime(self.index_path)
+
+    def link_user(self, user_key, video_id):
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO user_videos (user_key, video_id) VALUES (?, ?)", (user_key, video_id))
+
+    def search(self, query, k=4, video_id=None, user_key=None):
+        """Return the k closest chunks as Documents, optionally filtered to one video or a user's videos."""
+        with self._lock:
+            self._refresh()
+            if self.index is None or self.index.ntotal == 0:
+                return []
+
+            allowed = self._allowed_ids(video_id, user_key)
+            if allowed is not None and len(allowed) == 0:
+                return []
+
+            query_vector = np.asarray([self.embedding.embed_query(query)], dtype=np.float32)
+            if allowed is not None and len(allowed) <= self.exact_search_limit:
+                ids = self._exact_search(query_vector, allowed, k)
+            else:
+                params = None
+                if allowed is not None:
+                    params = faiss.SearchParametersHNSW(sel=faiss.IDSelectorBatch(allowed), efSearch=self.ef_search)
+                _, result = self.index.search(query_vector, k, params=params)
+                ids = [int(i) for i in result[0] if i >= 0]
+
+        return self._load_documents(ids)
+
+    def _allowed_ids(self, video_id, user_key):
+        if video_id is None and user_key is None:
+            return None
+        with self._connect() as conn:
+            if video_id is not None:
+                rows = conn.execute("SELECT id FROM chunks WHERE video_id = ?", (video_id,)).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT c.id FROM chunks c JOIN user_videos u ON u.video_id = c.video_id WHERE u.user_key = ?",
+                    (user_key,)
+                ).fetchall()
+        return np.asarray([r[0] for r in rows if r[0] < self.index.ntotal], dtype=np.int64)
+
+    def _exact_search(self, query_vector, ids, k):
+        vectors = np.vstack([self.index.reconstruct(int(i)) for i in ids])
+        distances = ((vectors - query_vector) ** 2).sum(axis=1)
+        order = np.argsort(distances)[:k]
+        return [int(ids[i]) for i in order]
+
+    def _load_documents(self, ids):
+        if not ids:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id, video_id, start, duration, text FROM chunks WHERE id IN ({','.join('?' * len(ids))})",
+                ids
+            ).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [
+            Document(
+                page_content=by_id[i][4],
+                metadata={"video_id": by_id[i][1], "start": by_id[i][2], "duration": by_id[i][3]}
+            )
+            for i in ids if i in by_id
+        ]
@@ -0,0 +1,138 @@
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+
+from langchain_community.vectorstores import FAISS
+
+
+class IndexCache:
+    """
+    On-disk + in-memory cache of per-video FAISS indexes.
+
+    Entries are keyed by (embedding model, video ID) and stored with FAISS
+    save_local() under <cache_dir>/<model>/<video_id>. Both levels evict the
+    least recently used entries once their byte budget is exceeded.
+    """
+
+    def __init__(self, embedding, embedding_model, cache_dir=None,
+                 max_disk_bytes=1024 ** 3, max_memory_bytes=256 * 1024 ** 2):
+        self.embedding = embedding
+        self.cache_dir = cache_dir or os.path.join(os.getcwd(), "index_cache")
+        self.model_dir = os.path.join(self.cache_dir, self._safe_name(embedding_model))
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        os.makedirs(self.model_dir, exist_ok=True)
+
+        self._memory = OrderedDict()  # video_id -> (vector_store, size_in_bytes)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _safe_name(name):
+        return re.sub(r"[^A-Za-z0-9_.-]", "__", name)
+
+    def _entry_path(self, video_id):
+        return os.path.join(self.model_dir, self._safe_name(video_id))
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for f in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, f))
+                except OSError:
+                    pass
+        return total
+
+    @staticmethod
+    def _memory_size(vector_store):
+        index = vector_store.index
+        text_bytes = sum(len(d.page_content) for d in vector_store.docstore._dict.values())
+        return index.ntotal * index.d * 4 + text_bytes
+
+    def get(self, video_id):
+        """Return the cached vector store for a video, or None on a miss."""
+        with self._lock:
+            if video_id in self._memory:
+                self._memory.move_to_end(video_id)
+                return self._memory[video_id][0]
+
+        path = self._entry_path(video_id)
+        if not os.path.isdir(path):
+            return None
+
+        try:
+            vector_store = FAISS.load_local(
+                path,
+                self.embedding,
+                allow_dangerous_deserialization=True  # files are written by this cache only
+            )
+        except Exception as e:
+            print(f"Failed to load cached index for {video_id}: {e}")
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+
+        # Bump the access time used for disk LRU ordering
+        try:
+            os.utime(path, None)
+        except OSError:
+            # Another worker evicted it after we loaded it; the loaded index is still good
+            pass
+        self._remember(video_id, vector_store)
+        return vector_store
+
+    def put(self, video_id, vector_store):
+        path = self._entry_path(video_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            vector_store.save_local(tmp_path)
+            if os.path.isdir(path):
+                # Another worker saved the same video first; keep theirs
+                shutil.rmtree(tmp_path, ignore_errors=True)
+            else:
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Failed to cache index for {video_id}: {e}")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return
+
+        self._remember(video_id, vector_store)
+        self._evict_disk()
+
+    def _remember(self, video_id, vector_store):
+        size = self._memory_size(vector_store)
+        with self._lock:
+            if video_id in self._memory:
+                self._memory_bytes -= self._memory.pop(video_id)[1]
+            self._memory[video_id] = (vector_store, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.model_dir):
+            path = os.path.join(self.model_dir, name)
+            if name.endswith(".tmp") or not os.path.isdir(path):
+                continue
+            entries.append((os.path.getmtime(path), self._dir_size(path), path))
+
+        total = sum(size for _, size, _ in entries)
+        # Oldest access first; always keep the most recent entry
+        for _, size, path in sorted(entries)[:-1]:
+            if total <= self.max_disk_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+        os.makedirs(self.model_dir, exist_ok=True)
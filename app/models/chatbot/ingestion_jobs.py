@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class IngestionJob:
+    """Progress of one transcript-ingestion run, stage by stage."""
+
+    STAGES = ("fetch", "chunk", "embed", "index", "qa")
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+    def __init__(self, youtube_url, session_key):
+        self.id = uuid.uuid4().hex
+        self.youtube_url = youtube_url
+        self.session_key = session_key
+        self.stages = {stage: self.PENDING for stage in self.STAGES}
+        self.status = self.PENDING
+        self.error = None
+        self.chat_ready = False
+        self.qa_pairs = []
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def start_stage(self, stage):
+        with self._lock:
+            self.status = self.RUNNING
+            self.stages[stage] = self.RUNNING
+
+    def finish_stage(self, stage, skipped=False):
+        with self._lock:
+            self.stages[stage] = self.SKIPPED if skipped else self.DONE
+
+    def fail(self, error):
+        with self._lock:
+            for stage, state in self.stages.items():
+                if state == self.RUNNING:
+                    self.stages[stage] = self.FAILED
+            self.status = self.FAILED
+            self.error = str(error)
+            self.finished_at = time.time()
+
+    def complete(self):
+        with self._lock:
+            self.status = self.DONE
+            self.finished_at = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            finished = sum(1 for s in self.stages.values() if s in (self.DONE, self.SKIPPED))
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "stages": dict(self.stages),
+                "progress": finished / len(self.STAGES),
+                "chat_ready": self.chat_ready,
+                "qa_pairs": list(self.qa_pairs),
+                "error": self.error
+            }
+
+
+class IngestionJobManager:
+    """
+    Runs ingestion pipelines on a background thread pool and keeps their
+    status for polling. Finished jobs are forgotten after job_ttl seconds.
+
+    Jobs live in this process only, so status requests must reach the worker
+    that accepted the job (sticky sessions when running several workers).
+    """
+
+    def __init__(self, max_workers=2, job_ttl=3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self.job_ttl = job_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pipeline, youtube_url, session_key):
+        """Queue pipeline(job) and return the new job immediately."""
+        job = IngestionJob(youtube_url, session_key)
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, pipeline, job)
+        return job
+
+    @staticmethod
+    def _run(pipeline, job):
+        try:
+            pipeline(job)
+            job.complete()
+        except Exception as e:
+            print(f"Ingestion job {job.id} failed: {e}")
+            job.fail(e)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _purge(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.job_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
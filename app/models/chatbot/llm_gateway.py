@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+
+import httpx
+
+from app.models.chatbot.config import Config
+
+RETRY_STATUS = {429, 502, 503, 504}
+_DONE = object()
+
+
+class GatewayBusy(RuntimeError):
+    """Raised when a lane's wait queue is full, so callers fail fast instead of piling up."""
+
+
+class LLMGateway:
+    """
+    Single entry point for every Ollama call in the app (chat, QA generation,
+    summaries, word explanations).
+
+    Requests run on one background asyncio loop over one pooled httpx client,
+    so Flask worker threads only wait on a future and connections are reused.
+    Each lane ("chat", "explain", "background", ...) has its own concurrency
+    limit and a bounded wait queue. Identical non-streaming requests that are
+    in flight at the same time share one Ollama call. Transport errors,
+    timeouts and 429/5xx responses are retried with exponential backoff.
+    """
+
+    def __init__(self, base_url, default_options=None, keep_alive=None, timeout=120, connect_timeout=5,
+                 max_retries=2, retry_backoff=0.5, max_connections=16, lane_limits=None, default_limit=2,
+                 max_queue=32):
+        """
+        default_options: Ollama options sent with every request (e.g. num_ctx); keeping them
+                         identical across callers avoids model reloads
+        timeout: seconds to wait for the next bytes of a response; connect_timeout for connecting
+        lane_limits: {lane: max concurrent requests}; other lanes get default_limit
+        max_queue: requests allowed to wait per lane before GatewayBusy is raised
+        """
+        self.base_url = base_url.rstrip("/")
+        self.default_options = {k: v for k, v in (default_options or {}).items() if v is not None}
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_connections = max_connections
+        self.lane_limits = lane_limits or {}
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self._loop = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    # --- event loop --------------------------------------------------------
+
+    def _ensure_loop(self):
+        # The loop thread and its connections don't survive fork(): start fresh in a child
+        if self._loop is not None and self._pid == os.getpid():
+            return self._loop
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections
+                    )
+                )
+                self._slots = {}  # lane -> asyncio.Semaphore
+                self._waiting = {}  # lane -> requests waiting for a slot
+                self._inflight = {}  # request key -> asyncio.Task
+                self._loop = loop
+                self._pid = os.getpid()
+        return self._loop
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # --- public API --------------------------------------------------------
+
+    def chat(self, messages, model, options=None, lane="default", timeout=None):
+        """
+        Blocking chat call; returns Ollama's /api/chat response dict.
+        timeout: seconds the call may take once it has a lane slot (None: only the read timeout applies)
+        """
+        return self._submit(self._chat(messages, model, options, lane, timeout)).result()
+
+    async def achat(self, messages, model, options=None, lane="default", timeout=None):
+        """Awaitable chat call usable from any event loop."""
+        return await asyncio.wrap_future(self._submit(self._chat(messages, model, options, lane, timeout)))
+
+    def stream_chat(self, messages, model, options=None, lane="default"):
+        """Yield Ollama's streamed /api/chat parts; the last one has done=True and the timings."""
+        parts = queue.Queue()
+        future = self._submit(self._stream(self._body(messages, model, options, stream=True), lane, parts))
+        try:
+            while True:
+                try:
+                    part = parts.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No response from the LLM for {self.timeout}s")
+                if part is _DONE:
+                    break
+                if isinstance(part, Exception):
+                    raise part
+                yield part
+        finally:
+            # Stops generation when the consumer goes away (e.g. client disconnected)
+            future.cancel()
+
+    @staticmethod
+    def content(response):
+        return response.get("message", {}).get("content", "")
+
+    # --- internals ---------------------------------------------------------
+
+    def _body(self, messages, model, options, stream):
+        body = {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "options": {**self.default_options, **(options or {})}
+        }
+        if self.keep_alive is not None:
+            body["keep_alive"] = self.keep_alive
+        return body
+
+    async def _chat(self, messages, model, options, lane, timeout=None):
+        body = self._body(messages, model, options, stream=False)
+        key = hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._post(body, lane, timeout))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller timing out must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _acquire(self, lane):
+        slot = self._slots.get(lane)
+        if slot is None:
+            slot = self._slots[lane] = asyncio.Semaphore(self.lane_limits.get(lane, self.default_limit))
+        if slot.locked():
+            if self._waiting.get(lane, 0) >= self.max_queue:
+                raise GatewayBusy(f"LLM lane '{lane}' is saturated, try again later")
+            self._waiting[lane] = self._waiting.get(lane, 0) + 1
+            try:
+                await slot.acquire()
+            finally:
+                self._waiting[lane] -= 1
+        else:
+            await slot.acquire()
+        return slot
+
+    async def _backoff(self, attempt):
+        await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _post(self, body, lane, timeout=None):
+        slot = await self._acquire(lane)
+        try:
+            # The time limit starts once the call has a slot, not while it waits behind others
+            return await asyncio.wait_for(self._post_with_retries(body), timeout)
+        finally:
+            slot.release()
+
+    async def _post_with_retries(self, body):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.post("/api/chat", json=body)
+                if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                    await self._backoff(attempt)
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    raise
+                await self._backoff(attempt)
+
+    async def _stream(self, body, lane, parts):
+        try:
+            slot = await self._acquire(lane)
+        except Exception as e:
+            parts.put(e)
+            return
+        try:
+            for attempt in range(self.max_retries + 1):
+                received = False
+                try:
+                    async with self._client.stream("POST", "/api/chat", json=body) as response:
+                        if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                            await self._backoff(attempt)
+                            continue
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if line.strip():
+                                received = True
+                                parts.put(json.loads(line))
+                    break
+                except httpx.TransportError:
+                    # Only retry before anything reached the caller
+                    if received or attempt == self.max_retries:
+                        raise
+                    await self._backoff(attempt)
+            parts.put(_DONE)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            parts.put(e)
+        finally:
+            slot.release()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    """Process-wide gateway configured from chatbot Config."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    Config.OLLAMA_BASE_URL,
+                    # 0 means "not set": None options are dropped from requests
+                    default_options={
+                        "num_ctx": Config.OLLAMA_NUM_CTX or None,
+                        "num_thread": Config.OLLAMA_NUM_THREAD or None
+                    },
+                    keep_alive=Config.OLLAMA_KEEP_ALIVE,
+                    timeout=Config.LLM_GATEWAY_TIMEOUT_SECONDS,
+                    max_retries=Config.LLM_GATEWAY_MAX_RETRIES,
+                    max_connections=Config.LLM_GATEWAY_MAX_CONNECTIONS,
+                    lane_limits={
+                        "chat": Config.LLM_GATEWAY_CHAT_CONCURRENCY,
+                        "explain": Config.LLM_GATEWAY_EXPLAIN_CONCURRENCY,
+                        "background": Config.LLM_GATEWAY_BACKGROUND_CONCURRENCY
+                    },
+                    max_queue=Config.LLM_GATEWAY_MAX_QUEUE
+                )
+    return _gateway
@@ -0,0 +1,61 @@
+import threading
+from collections import deque
+
+NS_PER_MS = 1_000_000
+
+
+class LLMMetrics:
+    """
+    Rolling prompt-evaluation vs generation timings reported by Ollama.
+
+    Ollama only evaluates prompt tokens that are not already in its KV cache,
+    so a low prompt_eval_tokens relative to the prompt size means the prefix
+    was reused. A non-zero load time means the model had to be (re)loaded.
+    """
+
+    def __init__(self, window=500):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, metadata):
+        """Record the response_metadata of an Ollama chat response, if it has timings."""
+        if not metadata or "eval_duration" not in metadata:
+            return
+        sample = {
+            "prompt_eval_tokens": metadata.get("prompt_eval_count") or 0,
+            "prompt_eval_ms": (metadata.get("prompt_eval_duration") or 0) / NS_PER_MS,
+            "generated_tokens": metadata.get("eval_count") or 0,
+            "generation_ms": (metadata.get("eval_duration") or 0) / NS_PER_MS,
+            "load_ms": (metadata.get("load_duration") or 0) / NS_PER_MS,
+            "total_ms": (metadata.get("total_duration") or 0) / NS_PER_MS,
+        }
+        with self._lock:
+            self._samples.append(sample)
+
+    def get_stats(self):
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return {"requests": 0}
+
+        def total(key):
+            return sum(s[key] for s in samples)
+
+        n = len(samples)
+        return {
+            "requests": n,
+            "avg_prompt_eval_ms": round(total("prompt_eval_ms") / n, 1),
+            "avg_prompt_eval_tokens": round(total("prompt_eval_tokens") / n, 1),
+            "avg_generation_ms": round(total("generation_ms") / n, 1),
+            "avg_generated_tokens": round(total("generated_tokens") / n, 1),
+            "generation_tokens_per_sec": round(total("generated_tokens") / (total("generation_ms") / 1000), 1)
+            if total("generation_ms") else None,
+            "prompt_eval_share": round(total("prompt_eval_ms") / (total("prompt_eval_ms") + total("generation_ms")), 3)
+            if total("prompt_eval_ms") + total("generation_ms") else None,
+            "model_loads": sum(1 for s in samples if s["load_ms"] > 100),
+            "last": samples[-1],
+        }
+
+
+# Process-wide timings of chat LLM calls
+llm_metrics = LLMMetrics()
@@ -6,4 +6,4 @@ processor = WhisperProcessor.from_pretrained(model_name)
 model = WhisperForConditionalGeneration.from_pretrained(model_name)
 
 processor.save_pretrained("./processor")
-model.save_pretrained("./model")
\ No newline at end of file
+model.save_pretrained("./model", safe_serialization=True)  # safetensors can be memory-mapped by WhisperModel
\ No newline at end of file
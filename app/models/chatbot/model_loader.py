@@ -1,21 +1,45 @@
 import os
+import shutil
+import torch
 from transformers import WhisperProcessor, WhisperForConditionalGeneration
 
+BACKENDS = ("fp32", "int8", "onnx")
+
 class WhisperModel:
-    def __init__(self, model_name="khizarAI/finetune-whisper-base.en"):
-        # Isolate HuggingFace cache for Whisper
-        os.environ["HF_HOME"] = os.path.join(os.getcwd(), "whisper_cache")
-        os.makedirs(os.environ["HF_HOME"], exist_ok=True)
+    def __init__(self, model_name="khizarAI/finetune-whisper-base.en", backend="fp32", num_threads=None, interop_threads=None,
+                 model_dir=None, processor_dir=None, cache_dir=None):
+        """
+        backend: "fp32" (default torch model), "int8" (dynamic int8 quantization of
+                 the linear layers) or "onnx" (ONNX Runtime export, needs optimum[onnxruntime])
+        num_threads / interop_threads: torch CPU thread pools; None keeps torch's defaults
+        model_dir / processor_dir: local snapshots (as written by model_download.py), used
+                 instead of the Hub when they contain a complete model/processor
+        cache_dir: Hub cache used when no local snapshot is available
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown Whisper backend '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self._configure_threads(num_threads, interop_threads)
+
+        # Whisper's Hub cache is passed explicitly; process-wide env vars are left alone
+        self.cache_dir = cache_dir or os.path.join(os.getcwd(), "whisper_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        processor_source = processor_dir if self._has_files(processor_dir, ["preprocessor_config.json", "tokenizer_config.json"]) else model_name
+        model_source = model_dir if self._has_weights(model_dir) else model_name
         
         try:
-            self.processor = WhisperProcessor.from_pretrained(
-                model_name,
-                cache_dir=os.environ["HF_HOME"]
-            )
-            self.model = WhisperForConditionalGeneration.from_pretrained(
-                model_name,
-                cache_dir=os.environ["HF_HOME"]
-            )
+            self.processor = self._from_pretrained(WhisperProcessor, processor_source)
+            if backend == "onnx":
+                self.model = self._load_onnx(model_source, self.cache_dir)
+            else:
+                # safetensors are memory-mapped; low_cpu_mem_usage skips the random init + copy
+                self.model = self._from_pretrained(
+                    WhisperForConditionalGeneration,
+                    model_source,
+                    low_cpu_mem_usage=True,
+                    use_safetensors=True if model_source == model_dir else None
+                )
         except Exception as e:
             raise RuntimeError(f"Whisper initialization failed: {str(e)}")
         # Explicitly configure generation settings
@@ -27,41 +51,73 @@ class WhisperModel:
             begin_suppress_tokens=None,   # Disable begin suppression
             forced_decoder_ids=None       # Ensure no conflicts with timestamps
         )
-        print("Model and processor loaded successfully.")
+
+        if backend == "int8":
+            # Linear layers dominate Whisper's CPU time; int8 weights also shrink RSS ~4x for them
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        if backend != "onnx":
+            self.model.eval()
+        print(f"Model and processor loaded successfully ({backend}, from {model_source}).")
+
+    @staticmethod
+    def _configure_threads(num_threads, interop_threads):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        if interop_threads:
+            try:
+                torch.set_num_interop_threads(interop_threads)
+            except RuntimeError as e:
+                # Can only be set before torch runs any parallel work
+                print(f"Could not set interop threads: {e}")
+
+    @staticmethod
+    def _has_files(directory, names):
+        return bool(directory) and all(os.path.isfile(os.path.join(directory, n)) for n in names)
+
+    @classmethod
+    def _has_weights(cls, directory):
+        return (cls._has_files(directory, ["config.json", "model.safetensors"])
+                or cls._has_files(directory, ["config.json", "model.safetensors.index.json"]))
+
+    def _from_pretrained(self, cls, source, **kwargs):
+        if os.path.isdir(source):
+            return cls.from_pretrained(source, local_files_only=True, **kwargs)
+        # Offline first: only hit the network when the cache has no snapshot
+        try:
+            return cls.from_pretrained(source, cache_dir=self.cache_dir, local_files_only=True, **kwargs)
+        except OSError:
+            return cls.from_pretrained(source, cache_dir=self.cache_dir, **kwargs)
+
+    @staticmethod
+    def _load_onnx(model_name, cache_dir):
+        try:
+            from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        except ImportError:
+            raise RuntimeError("The onnx backend requires optimum[onnxruntime] to be installed")
+
+        # Exporting takes minutes, so it is done once and saved under <cache_dir>/onnx/<model>
+        name = os.path.basename(os.path.normpath(model_name)) if os.path.isdir(model_name) else model_name.replace("/", "--")
+        export_dir = os.path.join(cache_dir, "onnx", name)
+        if os.path.isfile(os.path.join(export_dir, "config.json")) and any(
+            f.endswith(".onnx") for f in os.listdir(export_dir)
+        ):
+            return ORTModelForSpeechSeq2Seq.from_pretrained(export_dir, export=False)
+
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(model_name, export=True, cache_dir=cache_dir)
+        # Save next to the target and rename, so other workers never load a half-written export
+        tmp_dir = f"{export_dir}.{os.getpid()}.tmp"
+        try:
+            model.save_pretrained(tmp_dir)
+            os.makedirs(os.path.dirname(export_dir), exist_ok=True)
+            os.replace(tmp_dir, export_dir)
+        except OSError as e:
+            # Another worker saved it first, or the cache isn't writable: keep using the in-memory export
+            print(f"Could not save the ONNX export to {export_dir}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return model
     
     def get_processor(self):
         return self.processor
     
     def get_model(self):
         return self.model
-
-
-# from transformers import WhisperProcessor, WhisperForConditionalGeneration
-
-# class WhisperModel:
-#     def __init__(self, model_path="./FinetuneWhisper"):
-#         """
-#         Initialize the Whisper model and processor.
-        
-#         Parameters:
-#             model_path (str): Path to the locally saved model.
-#         """
-#         print("Loading Whisper model and processor...")
-#         self.processor = WhisperProcessor.from_pretrained("processor")
-#         self.model = WhisperForConditionalGeneration.from_pretrained("model")
-        
-#         # Explicitly configure generation settings
-#         self.model.config.forced_decoder_ids = None
-#         #self.model.generation_config.forced_decoder_ids = None
-#         self.model.generation_config.update(
-#             suppress_tokens=None,          # Disable default token suppression
-#             begin_suppress_tokens=None,   # Disable begin suppression
-#             forced_decoder_ids=None       # Ensure no conflicts with timestamps
-#         )
-#         print("Model and processor loaded successfully.")
-    
-#     def get_processor(self):
-#         return self.processor
-    
-#     def get_model(self):
-#         return self.model
@@ -0,0 +1,221 @@
+import functools
+import threading
+
+from app.models.chatbot.config import Config
+
+
+class ModelRegistry:
+    """
+    Owns the chatbot's heavy components (Whisper, the embedding model, the LLM
+    client) and loads each one the first time it is asked for.
+
+    Nothing is imported or loaded at construction time, so processes that only
+    serve auth/player pages never import torch. Call warm_up() to load the
+    components in a background thread ahead of the first request.
+    """
+
+    NOT_LOADED = "not_loaded"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+    # Components a request can't do without; what /ready waits for after a warm-up
+    CORE = ("whisper", "embeddings", "llm")
+
+    def __init__(self):
+        self._loaders = {
+            "whisper": self._load_whisper,
+            "asr": self._load_asr,
+            "embeddings": self._load_vector_store_manager,
+            "llm": self._load_llm,
+            "background_llm": self._load_background_llm,
+            "qa_generator": self._load_qa_generator,
+            "transcript_processor": self._load_transcript_processor,
+            "answer_cache": self._load_answer_cache,
+        }
+        self._components = {}
+        self._status = {name: self.NOT_LOADED for name in self._loaders}
+        self._errors = {}
+        self._locks = {name: threading.Lock() for name in self._loaders}
+        self._warmup_thread = None
+
+    def get(self, name):
+        # Fast path: already loaded, no locking needed
+        if name in self._components:
+            return self._components[name]
+
+        if name not in self._loaders:
+            raise KeyError(f"Unknown component: {name}")
+
+        with self._locks[name]:
+            if name in self._components:
+                return self._components[name]
+
+            self._status[name] = self.LOADING
+            try:
+                component = self._loaders[name]()
+            except Exception as e:
+                self._status[name] = self.FAILED
+                self._errors[name] = str(e)
+                raise
+            self._components[name] = component
+            self._status[name] = self.READY
+            self._errors.pop(name, None)
+            return component
+
+    @property
+    def whisper_model(self):
+        return self.get("whisper")
+
+    @property
+    def asr(self):
+        return self.get("asr")
+
+    @property
+    def vector_store_manager(self):
+        return self.get("embeddings")
+
+    @property
+    def llm(self):
+        return self.get("llm")
+
+    @property
+    def background_llm(self):
+        return self.get("background_llm")
+
+    @property
+    def qa_generator(self):
+        return self.get("qa_generator")
+
+    @property
+    def transcript_processor(self):
+        return self.get("transcript_processor")
+
+    @property
+    def answer_cache(self):
+        # None when ANSWER_CACHE_ENABLED is off
+        return self.get("answer_cache")
+
+    def warm_up(self, names=None):
+        """Load the given components (default: all) in a background thread."""
+        if self._warmup_thread is not None and self._warmup_thread.is_alive():
+            return self._warmup_thread
+
+        names = list(names or self._loaders)
+
+        def _run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Warm-up of {name} failed: {e}")
+            print("Model warm-up finished")
+
+        self._warmup_thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    def is_ready(self, names=None):
+        return all(self._status[name] == self.READY for name in (names or self._loaders))
+
+    def status(self):
+        return {
+            name: {"status": state, **({"error": self._errors[name]} if name in self._errors else {})}
+            for name, state in self._status.items()
+        }
+
+    # --- loaders -----------------------------------------------------------
+
+    def _load_whisper(self):
+        from app.models.chatbot.model_loader import WhisperModel
+
+        return WhisperModel(
+            backend=Config.WHISPER_BACKEND,
+            num_threads=Config.WHISPER_NUM_THREADS or None,
+            interop_threads=Config.WHISPER_INTEROP_THREADS or None,
+            model_dir=Config.WHISPER_MODEL_DIR,
+            processor_dir=Config.WHISPER_PROCESSOR_DIR
+        )
+
+    def _load_asr(self):
+        from app.models.chatbot.asr_worker import BatchedTranscriber
+        from app.models.chatbot.vad import segment_speech
+
+        whisper_model = self.whisper_model
+        segmenter = functools.partial(
+            segment_speech,
+            max_segment_seconds=Config.ASR_MAX_SEGMENT_SECONDS,
+            dynamic_range_db=Config.ASR_VAD_DYNAMIC_RANGE_DB
+        ) if Config.ASR_VAD_ENABLED else None
+        return BatchedTranscriber(
+            whisper_model.get_processor(),
+            whisper_model.get_model(),
+            max_batch_size=Config.ASR_MAX_BATCH_SIZE,
+            max_wait_ms=Config.ASR_MAX_WAIT_MS,
+            timeout=Config.ASR_TIMEOUT_SECONDS,
+            segmenter=segmenter
+        )
+
+    def _load_vector_store_manager(self):
+        from app.models.chatbot.transcript_processor import chunking_id
+        from app.models.chatbot.vector_store import VectorStoreManager
+
+        return VectorStoreManager(
+            Config.EMBEDDING_MODEL,
+            backend=Config.EMBEDDING_BACKEND,
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            onnx_file=Config.EMBEDDING_ONNX_FILE,
+            vector_storage=Config.VECTOR_STORAGE,
+            chunking_id=chunking_id(Config.TRANSCRIPT_CHUNK_TOKENS, Config.TRANSCRIPT_CHUNK_OVERLAP_TOKENS)
+        )
+
+    def _load_llm(self):
+        from app.models.chatbot.gateway_chat_model import GatewayChatModel
+        from app.models.chatbot.llm_gateway import get_gateway
+
+        # Shares the pooled Ollama client and its concurrency limits with the player
+        return GatewayChatModel(
+            gateway=get_gateway(),
+            model=Config.LLM_MODEL,
+            temperature=Config.LLM_TEMPERATURE,
+            lane="chat"
+        )
+
+    def _load_background_llm(self):
+        # Same model for QA generation and history summaries, limited separately
+        # so background work can't starve interactive chat
+        return self.llm.model_copy(update={"lane": "background"})
+
+    def _load_qa_generator(self):
+        from app.models.chatbot.qa_generator import QAGenerator
+
+        # Each chunk's LLM call gets QA_CHUNK_TIMEOUT_SECONDS once the background lane
+        # lets it run, so time queued behind other background work doesn't count
+        return QAGenerator(
+            self.background_llm.model_copy(update={"request_timeout": Config.QA_CHUNK_TIMEOUT_SECONDS}),
+            max_workers=Config.QA_MAX_WORKERS
+        )
+
+    def _load_transcript_processor(self):
+        from app.models.chatbot.transcript_processor import TranscriptProcessor
+
+        return TranscriptProcessor(
+            chunk_tokens=Config.TRANSCRIPT_CHUNK_TOKENS,
+            overlap_tokens=Config.TRANSCRIPT_CHUNK_OVERLAP_TOKENS
+        )
+
+
+    def _load_answer_cache(self):
+        if not Config.ANSWER_CACHE_ENABLED:
+            return None
+        from app.models.chatbot.answer_cache import SemanticAnswerCache
+
+        return SemanticAnswerCache(
+            self.vector_store_manager.embedding,
+            threshold=Config.ANSWER_CACHE_THRESHOLD,
+            ttl=Config.ANSWER_CACHE_TTL_SECONDS,
+            max_entries=Config.ANSWER_CACHE_MAX_ENTRIES
+        )
+
+
+# Process-wide registry shared by the chatbot routes
+registry = ModelRegistry()
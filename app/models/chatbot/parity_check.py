@@ -0,0 +1,70 @@
+"""
+Compare a Whisper inference backend against the fp32 model on recod.wav.
+
+Usage (from this directory):
+    python parity_check.py int8 --threads 4
+"""
+import argparse
+import difflib
+import os
+import resource
+import time
+import wave
+
+import numpy as np
+import torch
+
+from model_loader import WhisperModel, BACKENDS
+from transcribe_audio import transcribe_audio
+
+
+def load_wav(path):
+    with wave.open(path, "rb") as f:
+        if f.getframerate() != 16000 or f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise ValueError("Expected 16 kHz mono 16-bit PCM audio")
+        frames = f.readframes(f.getnframes())
+    return torch.from_numpy(np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0)
+
+
+def run(backend, audio, threads, runs):
+    whisper_model = WhisperModel(backend=backend, num_threads=threads)
+    processor, model = whisper_model.get_processor(), whisper_model.get_model()
+
+    transcribe_audio(audio, processor, model)  # warm-up
+    start = time.perf_counter()
+    for _ in range(runs):
+        text = transcribe_audio(audio, processor, model)[0]
+    return text.strip(), (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("backend", choices=[b for b in BACKENDS if b != "fp32"])
+    parser.add_argument("--audio", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "recod.wav"))
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--min-similarity", type=float, default=0.95)
+    args = parser.parse_args()
+
+    audio = load_wav(args.audio)
+
+    reference, reference_time = run("fp32", audio, args.threads, args.runs)
+    candidate, candidate_time = run(args.backend, audio, args.threads, args.runs)
+    # ru_maxrss is in KiB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    similarity = difflib.SequenceMatcher(None, reference.lower().split(), candidate.lower().split()).ratio()
+
+    print(f"\nfp32 ({reference_time:.2f}s): {reference}")
+    print(f"{args.backend} ({candidate_time:.2f}s): {candidate}")
+    print(f"\nSpeedup: {reference_time / candidate_time:.2f}x")
+    print(f"Word-level similarity: {similarity:.3f}")
+    print(f"Peak RSS (both models): {peak_rss_mb:.0f} MB")
+
+    if similarity < args.min_similarity:
+        raise SystemExit(f"Parity check failed: similarity {similarity:.3f} < {args.min_similarity}")
+    print("Parity check passed.")
+
+
+if __name__ == "__main__":
+    main()
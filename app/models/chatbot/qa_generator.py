@@ -1,16 +1,32 @@
 from langchain_classic.chains.question_answering import load_qa_chain
 from langchain_core.documents import Document
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 import re
 
 class QAGenerator:
-    def __init__(self, llm):
+    def __init__(self, llm, max_workers=4):
+        """
+        llm: LLM used by the QA chain; its per-call timeout (e.g. GatewayChatModel.request_timeout)
+             bounds each chunk, and chunks whose call fails or times out are skipped
+        max_workers: how many chunks are sent to the LLM concurrently
+        """
         self.qa_chain = load_qa_chain(llm, chain_type="stuff")
+        self.max_workers = max_workers
         
     def generate_qa_pairs(self, text_chunks):
-        df = pd.DataFrame({"text": text_chunks})
-        df["qa_pairs"] = df["text"].apply(lambda x: self._generate_single_qa_pair(x))
-        return self._process_qa_pairs(df["qa_pairs"])
+        return self._process_qa_pairs(self._generate_all(text_chunks))
+
+    def _generate_all(self, text_chunks):
+        """Generate one raw QA output per chunk concurrently, in chunk order."""
+        if not text_chunks:
+            return []
+        if self.max_workers <= 1:
+            return [self._generate_single_qa_pair(text) for text in text_chunks]
+
+        # Every call is bounded by the LLM's own timeout, so waiting on all of them always ends;
+        # failed or timed-out chunks come back as None from _generate_single_qa_pair
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="qa-gen") as executor:
+            return list(executor.map(self._generate_single_qa_pair, text_chunks))
     
     def _generate_single_qa_pair(self, text):
         try:
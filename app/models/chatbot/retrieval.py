@@ -0,0 +1,102 @@
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage
+
+from app.models.chatbot.answer_cache import is_history_independent
+from app.models.chatbot.chat_history import count_words
+
+SEARCH_TYPES = ("similarity", "mmr")
+QUERY_REWRITES = ("none", "concat", "llm")
+
+REWRITE_PROMPT = """Rewrite the learner's last question as a standalone search query about the video,
+resolving words like "it" or "that" from the conversation. Reply with the query only.
+
+Conversation:
+{conversation}
+
+Last question: {question}
+
+Standalone query:"""
+
+
+class ContextRetriever:
+    """
+    Retrieval stage of the chat: rewrites follow-up questions into standalone
+    queries, searches the video's FAISS index (plain similarity or MMR),
+    drops chunks below a similarity cutoff and keeps the best chunks that fit
+    a token budget for the prompt.
+    """
+
+    def __init__(self, vector_store, llm=None, k=4, fetch_k=20, search_type="similarity", mmr_lambda=0.5,
+                 min_similarity=0.0, max_context_tokens=800, query_rewrite="concat", count_tokens=count_words):
+        """
+        search_type: "similarity" or "mmr" (fetch_k candidates re-ranked for diversity by mmr_lambda)
+        min_similarity: cosine-similarity cutoff; embeddings are normalized to unit length,
+                        so FAISS's squared L2 distance d maps to 1 - d / 2
+        max_context_tokens: budget for the retrieved chunks (default counter: words)
+        query_rewrite: "none", "concat" (prepend the previous question to follow-ups)
+                       or "llm" (ask the LLM for a standalone query)
+        """
+        if search_type not in SEARCH_TYPES:
+            raise ValueError(f"Unknown search type '{search_type}', expected one of {SEARCH_TYPES}")
+        if query_rewrite not in QUERY_REWRITES:
+            raise ValueError(f"Unknown query rewrite '{query_rewrite}', expected one of {QUERY_REWRITES}")
+        if query_rewrite == "llm" and llm is None:
+            raise ValueError("query_rewrite='llm' needs an llm")
+        self.vector_store = vector_store
+        self.llm = llm
+        self.k = k
+        self.fetch_k = max(fetch_k, k)
+        self.search_type = search_type
+        self.mmr_lambda = mmr_lambda
+        self.min_similarity = min_similarity
+        self.max_context_tokens = max_context_tokens
+        self.query_rewrite = query_rewrite
+        self.count_tokens = count_tokens
+
+    def retrieve(self, question, chat_history=()):
+        query = self.rewrite_query(question, chat_history)
+        vector = self.vector_store.embeddings.embed_query(query)
+        if self.search_type == "mmr":
+            scored = self.vector_store.max_marginal_relevance_search_with_score_by_vector(
+                vector, k=self.k, fetch_k=self.fetch_k, lambda_mult=self.mmr_lambda
+            )
+        else:
+            scored = self.vector_store.similarity_search_with_score_by_vector(vector, k=self.k)
+
+        docs = [doc for doc, distance in scored if 1 - float(distance) / 2 >= self.min_similarity]
+        return self._fit_budget(docs)
+
+    def rewrite_query(self, question, chat_history=()):
+        """Turn a follow-up question into a query that makes sense without the conversation."""
+        previous = [m.content for m in chat_history if isinstance(m, HumanMessage)]
+        if self.query_rewrite == "none" or not previous or is_history_independent(question, True):
+            return question
+        if self.query_rewrite == "concat":
+            return f"{previous[-1]} {question}"
+
+        conversation = "\n".join(
+            f"{'Learner' if isinstance(m, HumanMessage) else 'Assistant'}: {m.content}"
+            for m in list(chat_history)[-4:]
+        )
+        try:
+            out = self.llm.invoke(REWRITE_PROMPT.format(conversation=conversation, question=question))
+            rewritten = str(getattr(out, "content", out)).strip()
+        except Exception as e:
+            print(f"Query rewrite failed: {e}")
+            return f"{previous[-1]} {question}"
+        return rewritten or question
+
+    def _fit_budget(self, docs):
+        """Keep the best-ranked chunks within max_context_tokens; the first one is truncated if needed."""
+        selected = []
+        used = 0
+        for doc in docs:
+            tokens = self.count_tokens(doc.page_content)
+            if used + tokens <= self.max_context_tokens:
+                selected.append(doc)
+                used += tokens
+            elif not selected:
+                words = doc.page_content.split()[:self.max_context_tokens]
+                selected.append(Document(page_content=" ".join(words), metadata=doc.metadata))
+                break
+        return selected
@@ -0,0 +1,139 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+
+class DiskSessionBackend:
+    """
+    Shares chat sessions between worker processes through small JSON files.
+
+    Only the chat history and the video ID are stored; the FAISS index itself
+    is restored from the per-video index cache.
+    """
+
+    def __init__(self, session_dir):
+        self.session_dir = session_dir
+        os.makedirs(self.session_dir, exist_ok=True)
+
+    def _path(self, session_key):
+        return os.path.join(self.session_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", session_key) + ".json")
+
+    def load(self, session_key):
+        try:
+            with open(self._path(session_key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        data["chat_history"] = messages_from_dict(data.get("chat_history", []))
+        return data
+
+    def save(self, session_key, video_id, chat_history):
+        path = self._path(session_key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "video_id": video_id,
+                "chat_history": messages_to_dict(chat_history),
+                "updated_at": time.time()
+            }, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, session_key):
+        try:
+            os.remove(self._path(session_key))
+        except OSError:
+            pass
+
+
+class ChatSessionStore:
+    """
+    Keeps one ChatHandler per user session.
+
+    Handlers live in an in-process LRU bounded by max_sessions and are dropped
+    after idle_ttl seconds without use. With a backend configured, a session
+    missing from this process is rebuilt from the stored history and video ID
+    using handler_factory(video_id).
+    """
+
+    def __init__(self, handler_factory, max_sessions=500, idle_ttl=3600, backend=None):
+        self.handler_factory = handler_factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.backend = backend
+        self._sessions = OrderedDict()  # session_key -> [handler, video_id, last_used]
+        self._lock = threading.Lock()
+
+    def get(self, session_key):
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_key)
+            if entry is not None:
+                if now - entry[2] > self.idle_ttl:
+                    del self._sessions[session_key]
+                    entry = None
+                else:
+                    entry[2] = now
+                    self._sessions.move_to_end(session_key)
+                    return entry[0]
+
+        return self._restore(session_key)
+
+    def _restore(self, session_key):
+        if self.backend is None:
+            return None
+
+        data = self.backend.load(session_key)
+        if data is None:
+            return None
+        if time.time() - data.get("updated_at", 0) > self.idle_ttl:
+            self.backend.delete(session_key)
+            return None
+
+        handler = self.handler_factory(data["video_id"])
+        if handler is None:
+            return None
+        handler.chat_history = data["chat_history"]
+        self._put(session_key, handler, data["video_id"])
+        return handler
+
+    def set(self, session_key, handler, video_id):
+        self._put(session_key, handler, video_id)
+        self.save(session_key)
+
+    def _put(self, session_key, handler, video_id):
+        now = time.time()
+        with self._lock:
+            self._sessions[session_key] = [handler, video_id, now]
+            self._sessions.move_to_end(session_key)
+            self._evict(now)
+
+    def _evict(self, now):
+        expired = [key for key, entry in self._sessions.items() if now - entry[2] > self.idle_ttl]
+        for key in expired:
+            del self._sessions[key]
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def save(self, session_key):
+        """Persist the session's history to the shared backend, if any."""
+        if self.backend is None:
+            return
+        with self._lock:
+            entry = self._sessions.get(session_key)
+        if entry is None:
+            return
+        try:
+            self.backend.save(session_key, entry[1], entry[0].chat_history)
+        except OSError as e:
+            print(f"Failed to save chat session {session_key}: {e}")
+
+    def remove(self, session_key):
+        with self._lock:
+            self._sessions.pop(session_key, None)
+        if self.backend is not None:
+            self.backend.delete(session_key)
@@ -0,0 +1,84 @@
+import numpy as np
+
+from app.models.chatbot.vad import last_pause, split_on_pauses
+
+
+class StreamingTranscription:
+    """
+    Incremental transcription of one live microphone stream.
+
+    Audio arrives as 16 kHz little-endian int16 PCM frames. Whenever the
+    uncommitted tail holds at least min_segment_seconds of audio followed by
+    a pause, everything up to that pause is queued for transcription once and
+    committed; tails that reach window_seconds without a pause are split at
+    their quietest point. Every partial_interval seconds of new audio the
+    tail is queued for an interim hypothesis. Decoding goes through the
+    transcriber's submit(), so the receive loop never waits on Whisper and
+    finish() only has to decode the short remaining tail.
+    """
+
+    def __init__(self, transcriber, sample_rate=16000, window_seconds=28, partial_interval=1.0,
+                 min_segment_seconds=2.0, pause_ms=500, dynamic_range_db=35):
+        """transcriber: needs submit(audio) returning a Future of the text (see BatchedTranscriber)"""
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.window = int(window_seconds * sample_rate)
+        self.partial_interval = int(partial_interval * sample_rate)
+        self.min_segment = int(min_segment_seconds * sample_rate)
+        self.pause_ms = pause_ms
+        self.dynamic_range_db = dynamic_range_db
+        self.committed = []  # Futures of committed segment texts, in order
+        self.tail = np.zeros(0, dtype=np.float32)
+        self._since_partial = 0
+        self._partial = None  # (Future, number of committed segments it follows)
+
+    def add_audio(self, pcm_bytes):
+        """Add a frame; returns an interim transcript when a new one is ready, else None."""
+        samples = np.frombuffer(pcm_bytes, dtype="<i2").astype(np.float32) / 32768.0
+        self.tail = np.concatenate([self.tail, samples])
+        self._since_partial += len(samples)
+
+        if len(self.tail) >= self.min_segment:
+            self._commit()
+
+        text = self._ready_partial()
+        if self._since_partial >= self.partial_interval and self._partial is None and len(self.tail):
+            self._since_partial = 0
+            self._partial = (self.transcriber.submit(self.tail.copy()), len(self.committed))
+        return text
+
+    def _commit(self):
+        if len(self.tail) > self.window:
+            segments = split_on_pauses(self.tail, self.sample_rate, self.window / self.sample_rate)
+            for segment in segments[:-1]:
+                self.committed.append(self.transcriber.submit(np.ascontiguousarray(segment)))
+            self.tail = np.ascontiguousarray(segments[-1])
+            return
+
+        cut = last_pause(
+            self.tail, self.sample_rate, min_pause_ms=self.pause_ms, dynamic_range_db=self.dynamic_range_db
+        )
+        if cut is not None and cut >= self.min_segment:
+            self.committed.append(self.transcriber.submit(self.tail[:cut].copy()))
+            self.tail = self.tail[cut:].copy()
+
+    def _ready_partial(self):
+        """Text of the in-flight interim decode once it (and the segments before it) finished."""
+        if self._partial is None:
+            return None
+        future, base = self._partial
+        if not future.done() or not all(f.done() for f in self.committed[:base]):
+            return None
+        self._partial = None
+        texts = [f.result() for f in self.committed[:base]] + [future.result()]
+        return " ".join(text for text in texts if text)
+
+    def finish(self):
+        """Transcribe the remaining tail and return the full transcript."""
+        if len(self.tail):
+            self.committed.append(self.transcriber.submit(self.tail))
+        self.tail = np.zeros(0, dtype=np.float32)
+        self._partial = None
+        timeout = getattr(self.transcriber, "timeout", None)
+        texts = [f.result(timeout=timeout) for f in self.committed]
+        return " ".join(text for text in texts if text)
@@ -1,19 +1,33 @@
 import torch
 
+SAMPLING_RATE = 16000
+# Whisper's short-form input is exactly 30s of audio
+SHORT_FORM_SAMPLES = 30 * SAMPLING_RATE
+
 def transcribe_audio(audio, processor, model):
     """
     Transcribe audio and return the transcription with timestamps.
     
     Parameters:
-        audio_tensor (torch.Tensor): Preprocessed audio tensor.
+        audio (torch.Tensor or list): Preprocessed audio tensor, or a list of them to transcribe as one batch.
         processor (WhisperProcessor): Loaded processor.
         model (WhisperForConditionalGeneration): Loaded Whisper model.
     
     Returns:
-        String: Transcription text
+        list: Transcription text, one entry per input clip
     """
-    inputs = processor(audio, sampling_rate=16000, truncation=False, padding="longest", return_attention_mask=True, return_tensors="pt")
-    with torch.no_grad():
+    if isinstance(audio, (list, tuple)):
+        audio = [a.numpy() if isinstance(a, torch.Tensor) else a for a in audio]
+        longest = max(len(a) for a in audio)
+    else:
+        longest = audio.shape[-1]
+    # Decide from the raw lengths so the log-mel features are computed once
+    if longest <= SHORT_FORM_SAMPLES:
+        # Every clip fits in 30s (always the case with VAD segmenting): regular padded short-form input
+        inputs = processor(audio, sampling_rate=SAMPLING_RATE, return_attention_mask=True, return_tensors="pt")
+    else:
+        inputs = processor(audio, sampling_rate=SAMPLING_RATE, truncation=False, padding="longest", return_attention_mask=True, return_tensors="pt")
+    with torch.inference_mode():
         predicted_ids = model.generate(**inputs, return_timestamps=True) 
 
         # predicted_ids = model.generate(inputs["input_features"], return_segments=True, return_dict_in_generate=True, return_timestamps=True)
@@ -1,37 +1,184 @@
+import numpy as np
 import pandas as pd
 from youtube_transcript_api import YouTubeTranscriptApi
 from langchain_core.documents import Document
 
+CHUNK_COLUMNS = ["text", "start", "end", "duration"]
+# Bump when chunk_transcript's output changes, so cached indexes built from old chunks are not reused
+CHUNKER_VERSION = 1
+
+def count_words(text):
+    return len(text.split())
+
+def chunking_id(chunk_tokens, overlap_tokens):
+    """Identifies the chunks a TranscriptProcessor produces, for cache keys."""
+    return f"chunks-v{CHUNKER_VERSION}-{chunk_tokens}-{overlap_tokens}"
+
 class TranscriptProcessor:
-    def __init__(self, chunk_duration=120):
-        self.chunk_duration = chunk_duration
-        
+    def __init__(self, chunk_tokens=200, overlap_tokens=40, count_tokens=None):
+        """
+        chunk_tokens: window size of a chunk, in tokens
+        overlap_tokens: tokens shared by consecutive chunks
+        count_tokens: text -> token count; defaults to whitespace-separated words
+
+        Windows are snapped to transcript-entry boundaries, so a chunk holds
+        every entry that overlaps its token window.
+        """
+        if not 0 <= overlap_tokens < chunk_tokens:
+            raise ValueError("overlap_tokens must be >= 0 and smaller than chunk_tokens")
+        self.chunk_tokens = chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.stride = chunk_tokens - overlap_tokens
+        self.count_tokens = count_tokens or count_words
+        self.chunking_id = chunking_id(chunk_tokens, overlap_tokens)
+
+    @staticmethod
+    def extract_video_id(youtube_url):
+        return youtube_url.split("v=")[-1].split("&")[0]
+
     def get_transcript(self, youtube_url):
         try:
-            video_id = youtube_url.split("v=")[-1].split("&")[0]
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
-            df = pd.DataFrame(transcript)
-            
-            grouped_transcript = []
-            current_chunk = {"start": 0, "text": ""}
-
-            for _, row in df.iterrows():
-                if row["start"] - current_chunk["start"] < self.chunk_duration:
-                    current_chunk["text"] += " " + row["text"]
-                else:
-                    current_chunk["duration"] = self.chunk_duration
-                    grouped_transcript.append(current_chunk)
-                    current_chunk = {"start": row["start"], "text": row["text"]}
-
-            if current_chunk:
-                current_chunk["duration"] = self.chunk_duration
-                grouped_transcript.append(current_chunk)
-
-            return pd.DataFrame(grouped_transcript)
-            
+            return self.chunk_transcript(self.fetch_transcript(youtube_url))
         except Exception as e:
             print(f"Error: {str(e)}")
             return None
 
-    def prepare_documents(self, df):
-        return [Document(metadata={}, page_content=text) for text in df["text"].tolist()]
\ No newline at end of file
+    def fetch_entries(self, youtube_url):
+        """Raw transcript entries (dicts with text/start/duration), in order."""
+        video_id = self.extract_video_id(youtube_url)
+        return YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
+
+    def fetch_transcript(self, youtube_url):
+        return pd.DataFrame(self.fetch_entries(youtube_url))
+
+    def _token_counts(self, texts):
+        if self.count_tokens is count_words:
+            return texts.str.split().str.len().to_numpy(dtype=np.int64)
+        return texts.map(self.count_tokens).to_numpy(dtype=np.int64)
+
+    def chunk_transcript(self, df):
+        """
+        Group transcript entries (text/start/duration rows) into overlapping
+        token windows. Returns a DataFrame with text, start, end and duration
+        (seconds) per chunk.
+        """
+        if df.empty:
+            return pd.DataFrame(columns=CHUNK_COLUMNS)
+        texts = df["text"].astype(str).str.replace("\n", " ", regex=False).str.strip()
+        tokens = self._token_counts(texts)
+        keep = tokens > 0
+        if not keep.any():
+            return pd.DataFrame(columns=CHUNK_COLUMNS)
+        texts = texts.to_numpy()[keep]
+        tokens = tokens[keep]
+        starts = df["start"].to_numpy(dtype=np.float64)[keep]
+        ends = starts + df["duration"].to_numpy(dtype=np.float64)[keep]
+
+        token_end = np.cumsum(tokens)
+        token_start = token_end - tokens
+        positions = np.arange(0, token_end[-1], self.stride)
+        # Entries overlapping [position, position + chunk_tokens)
+        first = np.searchsorted(token_end, positions, side="right")
+        last = np.searchsorted(token_start, positions + self.chunk_tokens, side="left")
+
+        # Stop at the first window that reaches the final entry, then drop
+        # windows that cover the same entries as the one before them
+        count = int(np.searchsorted(last, len(texts), side="left")) + 1
+        first, last = first[:count], last[:count]
+        distinct = np.ones(count, dtype=bool)
+        distinct[1:] = (first[1:] != first[:-1]) | (last[1:] != last[:-1])
+        first, last = first[distinct], last[distinct]
+
+        chunk_start = starts[first]
+        chunk_end = np.maximum(np.maximum.accumulate(ends)[last - 1], chunk_start)
+        return pd.DataFrame({
+            "text": [" ".join(texts[f:l]) for f, l in zip(first, last)],
+            "start": chunk_start,
+            "end": chunk_end,
+            "duration": chunk_end - chunk_start
+        })
+
+    def iter_chunks(self, entries):
+        """
+        Streaming version of chunk_transcript: consumes transcript entries
+        (dicts with text/start/duration) one at a time and yields each chunk
+        (a dict with the same columns) as soon as its window is complete.
+        Produces the same chunks as chunk_transcript.
+        """
+        buffer = []  # [token_start, token_end, text, start, end] of entries still needed
+        total = 0
+        position = 0
+        previous = None
+        index = 0  # global index of buffer[0]
+        latest_end = float("-inf")
+
+        def window():
+            limit = position + self.chunk_tokens
+            first = next(i for i, e in enumerate(buffer) if e[1] > position)
+            last = next((i for i, e in enumerate(buffer) if e[0] >= limit), len(buffer))
+            return first, last
+
+        def make_chunk(first, last):
+            selected = buffer[first:last]
+            start = selected[0][3]
+            end = max(max(e[4] for e in selected), start)
+            return {
+                "text": " ".join(e[2] for e in selected),
+                "start": start,
+                "end": end,
+                "duration": end - start
+            }
+
+        for entry in entries:
+            text = str(entry["text"]).replace("\n", " ").strip()
+            tokens = self.count_tokens(text)
+            if tokens <= 0:
+                continue
+            start = float(entry["start"])
+            # Chunk ends never move backwards, matching the running max in chunk_transcript
+            latest_end = max(latest_end, start + float(entry["duration"]))
+            buffer.append([total, total + tokens, text, start, latest_end])
+            total += tokens
+
+            # A window is complete once an entry past its end has arrived
+            while buffer[-1][0] >= position + self.chunk_tokens:
+                first, last = window()
+                bounds = (index + first, index + last)
+                if bounds != previous:
+                    yield make_chunk(first, last)
+                    previous = bounds
+                position += self.stride
+                while buffer[0][1] <= position:
+                    buffer.pop(0)
+                    index += 1
+
+        while buffer and position < total:
+            first, last = window()
+            bounds = (index + first, index + last)
+            if bounds != previous:
+                yield make_chunk(first, last)
+                previous = bounds
+            if last == len(buffer):
+                break
+            position += self.stride
+            while buffer[0][1] <= position:
+                buffer.pop(0)
+                index += 1
+
+    @staticmethod
+    def _document(text, start, duration, video_id):
+        return Document(
+            metadata={"video_id": video_id, "start": float(start), "duration": float(duration)},
+            page_content=text
+        )
+
+    def prepare_documents(self, df, video_id=None):
+        return [
+            self._document(text, start, duration, video_id)
+            for text, start, duration in zip(df["text"].tolist(), df["start"].tolist(), df["duration"].tolist())
+        ]
+
+    def iter_documents(self, entries, video_id=None):
+        """Chunk Documents from iter_chunks, yielded as soon as each window is complete."""
+        for chunk in self.iter_chunks(entries):
+            yield self._document(chunk["text"], chunk["start"], chunk["duration"], video_id)
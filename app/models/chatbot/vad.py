@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def frame_energy_db(samples, sample_rate, frame_ms=30):
+    """RMS energy in dB of consecutive non-overlapping frames."""
+    frame_len = max(int(sample_rate * frame_ms / 1000), 1)
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32), frame_len
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(rms + 1e-10), frame_len
+
+
+def trim_silence(samples, sample_rate=16000, frame_ms=30, dynamic_range_db=35, floor_db=-60, pad_ms=200):
+    """
+    Cut leading and trailing silence.
+
+    A frame counts as speech when it is within dynamic_range_db of the
+    loudest frame and above floor_db. pad_ms of audio is kept around the
+    detected speech. Returns an empty array when no speech is found.
+    """
+    energy, frame_len = frame_energy_db(samples, sample_rate, frame_ms)
+    if len(energy) == 0:
+        return samples
+
+    threshold = max(energy.max() - dynamic_range_db, floor_db)
+    voiced = np.flatnonzero(energy > threshold)
+    if len(voiced) == 0:
+        return samples[:0]
+
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(voiced[0] * frame_len - pad, 0)
+    end = min((voiced[-1] + 1) * frame_len + pad, len(samples))
+    return samples[start:end]
+
+
+def last_pause(samples, sample_rate=16000, min_pause_ms=500, frame_ms=30, dynamic_range_db=35, floor_db=-60):
+    """
+    Sample index in the middle of the last pause of at least min_pause_ms
+    that follows speech, or None. Silence is judged like trim_silence.
+    """
+    energy, frame_len = frame_energy_db(samples, sample_rate, frame_ms)
+    if len(energy) == 0:
+        return None
+
+    threshold = max(energy.max() - dynamic_range_db, floor_db)
+    voiced = np.flatnonzero(energy > threshold)
+    if len(voiced) == 0:
+        return None
+
+    # Runs of silent frames: starts/ends where the silent mask flips
+    silent = np.concatenate([[0], (energy <= threshold).astype(np.int8), [0]])
+    edges = np.diff(silent)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    min_frames = max(int(np.ceil(min_pause_ms / frame_ms)), 1)
+    pauses = np.flatnonzero((ends - starts >= min_frames) & (starts > voiced[0]))
+    if len(pauses) == 0:
+        return None
+    start, end = starts[pauses[-1]], ends[pauses[-1]]
+    return int((start + end) // 2 * frame_len)
+
+
+def split_on_pauses(samples, sample_rate=16000, max_segment_seconds=28, frame_ms=30):
+    """
+    Split audio into segments no longer than max_segment_seconds, cutting at
+    the quietest frame in the second half of each window so words aren't
+    split mid-way.
+    """
+    max_len = int(max_segment_seconds * sample_rate)
+    if len(samples) <= max_len:
+        return [samples]
+
+    energy, frame_len = frame_energy_db(samples, sample_rate, frame_ms)
+    segments = []
+    start = 0
+    while len(samples) - start > max_len:
+        first_frame = (start + max_len // 2) // frame_len
+        last_frame = (start + max_len) // frame_len
+        cut_frame = first_frame + int(np.argmin(energy[first_frame:last_frame]))
+        # Cut in the middle of the quietest frame
+        cut = cut_frame * frame_len + frame_len // 2
+        segments.append(samples[start:cut])
+        start = cut
+    segments.append(samples[start:])
+    return segments
+
+
+def segment_speech(samples, sample_rate=16000, max_segment_seconds=28, **trim_kwargs):
+    """Trim silence, then split long audio into Whisper-sized segments."""
+    if hasattr(samples, "numpy"):
+        samples = samples.numpy()
+    trimmed = trim_silence(samples, sample_rate, **trim_kwargs)
+    if len(trimmed) == 0:
+        return []
+    return split_on_pauses(trimmed, sample_rate, max_segment_seconds)
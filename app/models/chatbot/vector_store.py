@@ -4,27 +4,160 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import WebBaseLoader
 from langchain_core.documents import Document
+from app.models.chatbot.config import Config
+from app.models.chatbot.index_cache import IndexCache
+from app.models.chatbot.cached_embeddings import CachedEmbeddings
+from app.models.chatbot.global_index import GlobalVectorIndex
 
 import os
 
+EMBEDDING_BACKENDS = ("torch", "onnx", "openvino")
+VECTOR_STORAGE = ("float32", "float16", "int8")
+
+def build_embedder(model_name, backend="torch", batch_size=32, onnx_file=None, cache_folder=None):
+    """
+    Create the sentence-transformers embedder for a backend:
+    - "torch": the default fp32 PyTorch model
+    - "onnx" / "openvino": exported runtimes (sentence-transformers >= 3.2); pass
+      onnx_file (e.g. "onnx/model_qint8_avx2.onnx") to load an int8-quantized export
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+    model_kwargs = {}
+    if backend != "torch":
+        model_kwargs["backend"] = backend
+        if onnx_file:
+            model_kwargs["model_kwargs"] = {"file_name": onnx_file}
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        cache_folder=cache_folder,
+        model_kwargs=model_kwargs,
+        # Unit vectors, so FAISS's L2 distances rank and score like cosine similarity
+        encode_kwargs={"batch_size": batch_size, "normalize_embeddings": True}
+    )
+
 class VectorStoreManager:
-    # def __init__(self, embedding_model):
-    #     self.embedding = HuggingFaceEmbeddings(model_name=embedding_model)
-    #     self.vector_store = None
-    def __init__(self, embedding_model):
-        # Isolate embedding model cache
-        os.environ["HF_HOME"] = os.path.join(os.getcwd(), "embedding_cache")
-        os.makedirs(os.environ["HF_HOME"], exist_ok=True)
+    def __init__(self, embedding_model, backend="torch", batch_size=32, onnx_file=None, vector_storage="float32",
+                 chunking_id="default"):
+        """
+        embedding_model: sentence-transformers model name
+        backend / batch_size / onnx_file: see build_embedder()
+        vector_storage: how FAISS stores vectors: "float32" (exact), "float16" or "int8" (scalar quantized)
+        chunking_id: identifies how transcripts were chunked (see transcript_processor.chunking_id);
+                     per-video and global indexes are kept apart per chunking
+        """
+        if vector_storage not in VECTOR_STORAGE:
+            raise ValueError(f"Unknown vector storage '{vector_storage}', expected one of {VECTOR_STORAGE}")
+        self.vector_storage = vector_storage
+
+        # Isolate embedding model cache; passed explicitly so Whisper's Hub cache is never affected
+        cache_folder = os.path.join(os.getcwd(), "embedding_cache")
+        os.makedirs(cache_folder, exist_ok=True)
+
+        # Cached vectors and indexes are only valid for the exact model + runtime that produced them
+        embedding_id = embedding_model if backend == "torch" else f"{embedding_model}-{backend}-{onnx_file or 'default'}"
         
-        self.embedding = HuggingFaceEmbeddings(
-            model_name=embedding_model,
-            cache_folder=os.environ["HF_HOME"]
+        # Each unique chunk/query text is embedded once and reused from the cache
+        self.embedding = CachedEmbeddings(
+            build_embedder(embedding_model, backend, batch_size, onnx_file, cache_folder=cache_folder),
+            embedding_id,
+            Config.EMBEDDING_CACHE_PATH,
+            max_memory_entries=Config.EMBEDDING_CACHE_MEMORY_ENTRIES,
+            dtype=Config.EMBEDDING_CACHE_DTYPE,
+            max_disk_entries=Config.EMBEDDING_CACHE_MAX_DISK_ENTRIES
         )
         self.vector_store = None
+        self.index_cache = IndexCache(
+            self.embedding,
+            f"{embedding_id}-{vector_storage}-{chunking_id}",
+            max_disk_bytes=Config.INDEX_CACHE_MAX_DISK_MB * 1024 * 1024,
+            max_memory_bytes=Config.INDEX_CACHE_MAX_MEMORY_MB * 1024 * 1024
+        )
+        # Cross-video index of every processed chunk, searchable per video or per user
+        self.global_index = None
+        if Config.GLOBAL_INDEX_ENABLED:
+            self.global_index = GlobalVectorIndex(
+                # One index per model + chunking, so has_video() is only true for chunks made the current way
+                os.path.join(Config.GLOBAL_INDEX_DIR, f"{embedding_id.replace('/', '--')}--{chunking_id}"),
+                self.embedding,
+                hnsw_m=Config.GLOBAL_INDEX_HNSW_M,
+                ef_search=Config.GLOBAL_INDEX_EF_SEARCH
+            )
         
-    def create_vector_store(self, docs):
-        self.vector_store = FAISS.from_documents(docs, embedding=self.embedding)
+    def create_vector_store(self, docs, video_id=None):
+        return self.create_vector_store_from_embeddings(docs, self.embed_documents(docs), video_id=video_id)
+
+    def embed_documents(self, docs):
+        return self.embedding.embed_documents([d.page_content for d in docs])
+
+    def create_vector_store_from_embeddings(self, docs, embeddings, video_id=None):
+        """Build the FAISS index from vectors computed by embed_documents()."""
+        texts = [d.page_content for d in docs]
+        metadatas = [d.metadata for d in docs]
+        if self.vector_storage == "float32":
+            self.vector_store = FAISS.from_embeddings(
+                zip(texts, embeddings),
+                embedding=self.embedding,
+                metadatas=metadatas
+            )
+        else:
+            self.vector_store = self._create_quantized_store(texts, embeddings, metadatas)
+        if video_id:
+            self.index_cache.put(video_id, self.vector_store)
         return self.vector_store
+
+    def _create_quantized_store(self, texts, embeddings, metadatas):
+        import faiss
+        import numpy as np
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        quantizer_type = faiss.ScalarQuantizer.QT_fp16 if self.vector_storage == "float16" else faiss.ScalarQuantizer.QT_8bit
+        index = faiss.IndexScalarQuantizer(vectors.shape[1], quantizer_type, faiss.METRIC_L2)
+        index.train(vectors)  # learns per-dimension ranges for int8
+
+        vector_store = FAISS(self.embedding, index, InMemoryDocstore(), {})
+        vector_store.add_embeddings(zip(texts, embeddings), metadatas=metadatas)
+        return vector_store
+
+    def load_cached_vector_store(self, video_id):
+        """Return the cached index for a video without re-embedding, or None."""
+        vector_store = self.index_cache.get(video_id)
+        if vector_store is not None:
+            self.vector_store = vector_store
+        return vector_store
+
+    def add_to_global_index(self, video_id, vector_store, embeddings=None, user_key=None):
+        """
+        Add a video's chunks to the global index (once per video) and link the
+        video to the user. Without embeddings the vectors are read back from the
+        per-video index (exact for float32 storage, approximate when quantized).
+        """
+        if self.global_index is None:
+            return
+        if not self.global_index.has_video(video_id):
+            docs = self.get_documents(vector_store)
+            if embeddings is None:
+                embeddings = vector_store.index.reconstruct_n(0, len(docs))
+            self.global_index.add_video(video_id, docs, embeddings)
+        if user_key:
+            self.global_index.link_user(user_key, video_id)
+
+    @staticmethod
+    def get_documents(vector_store):
+        # Chunk documents in the order they were indexed
+        return [
+            vector_store.docstore.search(doc_id)
+            for _, doc_id in sorted(vector_store.index_to_docstore_id.items())
+        ]
+
+    @staticmethod
+    def get_texts(vector_store):
+        # Chunk texts in the order they were indexed
+        return [
+            vector_store.docstore.search(doc_id).page_content
+            for _, doc_id in sorted(vector_store.index_to_docstore_id.items())
+        ]
         
     def update_vector_store(self, link):
         docs = self._get_docs_from_web(link)
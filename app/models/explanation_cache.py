@@ -0,0 +1,126 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_word(word):
+    return re.sub(r"^[^\w']+|[^\w']+$", "", word.strip().lower())
+
+
+def normalize_sentence(sentence):
+    return " ".join(sentence.lower().split())
+
+
+class ExplanationCache:
+    """
+    Two-level cache of word explanations: an in-process LRU in front of a
+    SQLite table shared by all workers. Entries are keyed by the normalized
+    word, sentence and model name and expire after ttl seconds.
+    """
+
+    def __init__(self, db_path, ttl=7 * 24 * 3600, max_memory_entries=2000, max_disk_entries=100000):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (response, created_at)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS explanations ("
+                " key TEXT PRIMARY KEY, word TEXT, model TEXT, response TEXT,"
+                " created_at REAL, last_access REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_explanations_last_access ON explanations(last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    @staticmethod
+    def make_key(word, sentence, model):
+        raw = "\x00".join((model, normalize_word(word), normalize_sentence(sentence)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, word, sentence, model):
+        key = self.make_key(word, sentence, model)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, created_at FROM explanations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl:
+                    conn.execute("UPDATE explanations SET last_access = ? WHERE key = ?", (now, key))
+                else:
+                    row = None
+        except sqlite3.Error as e:
+            print(f"Explanation cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, row[0], row[1])
+        return row[0]
+
+    def put(self, word, sentence, model, response):
+        key = self.make_key(word, sentence, model)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, response, now)
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO explanations (key, word, model, response, created_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, normalize_word(word), model, response, now, now)
+                )
+                self._evict_disk(conn, now)
+        except sqlite3.Error as e:
+            print(f"Explanation cache write failed: {e}")
+
+    def _remember(self, key, response, created_at):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, conn, now):
+        conn.execute("DELETE FROM explanations WHERE created_at < ?", (now - self.ttl,))
+        count = conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+        if count > self.max_disk_entries:
+            conn.execute(
+                "DELETE FROM explanations WHERE key IN ("
+                " SELECT key FROM explanations ORDER BY last_access LIMIT ?)",
+                (count - self.max_disk_entries,)
+            )
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -1,28 +1,90 @@
-import os
-from openai import OpenAI
+from app.config import Config
+from app.models.explanation_cache import ExplanationCache
+from app.models.chatbot.llm_gateway import get_gateway
 
 # Initialize the Groq client with your API key
 #api_key = os.getenv('Groq_API_KEY')
 
-client = OpenAI(
-    api_key="ollama",
-    base_url="http://localhost:11434/v1"
+MODEL_NAME = "gemma3:4b"  # Replace with your desired model
+
+explanation_cache = ExplanationCache(
+    Config.EXPLANATION_CACHE_PATH,
+    ttl=Config.EXPLANATION_CACHE_TTL_SECONDS,
+    max_memory_entries=Config.EXPLANATION_CACHE_MEMORY_ENTRIES,
+    max_disk_entries=Config.EXPLANATION_CACHE_DISK_ENTRIES
 )
 
-def generate_response_from_llm(prompt):
+def generate_response_from_llm(prompt, lane="explain"):
 
     try:
-            # Create a chat completion
-        chat_completion = client.chat.completions.create(
-        messages=[
-            {"role": "system", "content": "You are an English tutor."},
-            {"role": "user", "content": prompt}
-        ],
-        model="gemma3:4b"  # Replace with your desired model
-    )
+        # Goes through the shared Ollama gateway (pooled client, retries, per-lane limits)
+        gateway = get_gateway()
+        response = gateway.chat(
+            [
+                {"role": "system", "content": "You are an English tutor."},
+                {"role": "user", "content": prompt}
+            ],
+            MODEL_NAME,
+            lane=lane
+        )
 
         # Return the assistant's response
-        return chat_completion.choices[0].message.content
+        return gateway.content(response)
 
     except Exception as e:
         return f"❌ Error getting response from Ollama: {e}"
+
+def build_explanation_prompt(word, sentence):
+    return f"""
+**You are an expert English tutor specializing in ESL (English as a Second Language).**
+The student clicked on the word "{word}" in this sentence:
+"{sentence}"
+
+Provide a comprehensive explanation using EXACTLY this template (include ALL sections and formatting):
+
+✨ **Word Focus**: _{word}_  
+   - Pronunciation: /.../ (add phonetic if possible)
+   - Part of Speech: (noun/verb/adjective/etc.)
+
+📚 **Core Meanings**:
+1. Primary Definition: (Most common meaning)
+2. Secondary Definition: (Other important meanings)
+
+🔍 **In This Sentence**:  
+   - Explain how the word functions here
+   - Break down any idioms/phrasal verbs if present
+
+🎯 **Learning Tips**:
+   - Memory Trick: (Mnemonic or visual association)
+   - Common Mistakes: (What learners often get wrong)
+   - Related Words: (Synonyms/antonyms/word family)
+
+💬 **Usage Examples**:
+   - Formal: (Professional/formal context example)
+   - Casual: (Everyday conversation example)
+   - Academic: (Writing/essay example)
+
+🌍 **Cultural Note**:  
+   - How native speakers commonly use this word
+   - Any regional variations
+
+📝 **Practice Exercise**:  
+   "Complete this sentence: _[missing word]_"
+
+🔔 **Teacher's Note**:  
+   (Encouraging message about mastering this word)
+
+=== (Response must end with this divider) ===
+"""
+
+def explain_word(word, sentence, lane="explain"):
+    """Explain a clicked word, serving repeated lookups from the cache"""
+    cached = explanation_cache.get(word, sentence, MODEL_NAME)
+    if cached is not None:
+        return cached
+
+    response = generate_response_from_llm(build_explanation_prompt(word, sentence), lane=lane)
+    # Don't cache failed calls
+    if not response.startswith("❌"):
+        explanation_cache.put(word, sentence, MODEL_NAME, response)
+    return response
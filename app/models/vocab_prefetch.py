@@ -0,0 +1,102 @@
+import math
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Words learners rarely need explained; never worth a prefetch
+STOP_WORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "so", "of", "to", "in", "on", "at", "by",
+    "for", "with", "from", "up", "out", "as", "is", "are", "was", "were", "be", "been",
+    "am", "do", "does", "did", "have", "has", "had", "i", "you", "he", "she", "it", "we",
+    "they", "me", "him", "her", "us", "them", "my", "your", "his", "its", "our", "their",
+    "this", "that", "these", "those", "what", "which", "who", "when", "where", "why",
+    "how", "not", "no", "yes", "can", "will", "would", "just", "all", "there", "here",
+    "then", "than", "very", "about", "into", "over", "like", "get", "got", "go", "going",
+    "know", "okay", "oh", "um", "uh", "yeah", "don't", "it's", "i'm", "that's",
+}
+
+# Same cleanup player.js applies to a clicked word (`word.replace(/[^\w']/g, '')`),
+# so prefetched cache keys match real clicks; JS's \w is ASCII-only
+CLICK_STRIP_RE = re.compile(r"[^\w']", re.ASCII)
+
+
+def clicked_words(sentence):
+    """The words the player sends for each clickable span of a subtitle line."""
+    return [CLICK_STRIP_RE.sub("", token) for token in sentence.split()]
+
+
+def rank_words(sentences, top_n):
+    """
+    Pick the top_n (word, sentence) pairs most likely to be clicked.
+
+    Longer words are treated as harder and words repeated across the video
+    as more likely to be looked up. Explanations are cached per sentence, so
+    every line a top word appears on is its own pair; the best words are
+    covered first until top_n pairs are picked.
+    """
+    counts = Counter()
+    occurrences = {}  # word -> {sentence: token as clicked}, in subtitle order
+    for sentence in sentences:
+        for token in clicked_words(sentence):
+            word = token.lower()
+            if word in STOP_WORDS or len(word) < 4 or not any(c.isalpha() for c in word):
+                continue
+            counts[word] += 1
+            # The explanation cache lowercases words, so one pair per line is enough
+            pairs = occurrences.setdefault(word, {})
+            pairs.setdefault(sentence, token)
+
+    def score(word):
+        return min(len(word), 12) * math.log1p(counts[word])
+
+    picked = []
+    for word in sorted(counts, key=score, reverse=True):
+        pairs = [(token, sentence) for sentence, token in occurrences[word].items()]
+        picked.extend(pairs[:top_n - len(picked)])
+        if len(picked) >= top_n:
+            break
+    return picked
+
+
+class VocabularyPrefetcher:
+    """
+    Generates explanations for a video's likeliest word clicks in the
+    background and stores them through explain(word, sentence), which is
+    expected to populate the explanation cache.
+    """
+
+    def __init__(self, explain, top_n=20, max_workers=2):
+        self.explain = explain
+        self.top_n = top_n
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vocab-prefetch")
+        self._pending = {}  # video_id -> explanations still queued
+        self._lock = threading.Lock()
+
+    def prefetch(self, video_id, sentences):
+        """Queue one explanation job per top-ranked word unless this video is already queued."""
+        with self._lock:
+            if video_id in self._pending:
+                return False
+
+        pairs = rank_words(sentences, self.top_n)
+        with self._lock:
+            if not pairs or video_id in self._pending:
+                return False
+            self._pending[video_id] = len(pairs)
+
+        for word, sentence in pairs:
+            self._executor.submit(self._explain_one, video_id, word, sentence)
+        return True
+
+    def _explain_one(self, video_id, word, sentence):
+        try:
+            # Pairs already cached are returned by explain() without an LLM call
+            self.explain(word, sentence)
+        except Exception as e:
+            print(f"Prefetch of '{word}' failed: {e}")
+        finally:
+            with self._lock:
+                self._pending[video_id] -= 1
+                if self._pending[video_id] <= 0:
+                    del self._pending[video_id]
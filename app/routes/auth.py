@@ -1,9 +1,9 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
-from app.database import create_user, verify_user
+from app.database import create_user, verify_user, invalidate_user_cache
 
 bp = Blueprint('auth', __name__)
 
-from flask_login import login_user, logout_user, login_required
+from flask_login import login_user, logout_user, login_required, current_user
 from app.models.user import User
 
 from flask import flash
@@ -51,6 +51,8 @@ def main():
 
 @bp.route('/logout')
 def logout():
+    if current_user.is_authenticated:
+        invalidate_user_cache(current_user.get_id())
     logout_user()  # This clears the user session
     flash('You have been logged out', 'success')
     return redirect(url_for('auth.login'))
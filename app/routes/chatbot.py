@@ -1,131 +1,282 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, Blueprint
-from langchain_ollama import ChatOllama
+from flask import Flask, render_template, request, jsonify, redirect, url_for, Blueprint, session, Response, stream_with_context
+from flask_login import current_user
+from flask_sock import Sock, ConnectionClosed
 from app.models.chatbot.config import Config
-from app.models.chatbot.transcript_processor import TranscriptProcessor
-from app.models.chatbot.qa_generator import QAGenerator
-from app.models.chatbot.vector_store import VectorStoreManager
 from app.models.chatbot.chat_handler import ChatHandler
-from app.models.chatbot.audio_preprocessor import preprocess_audio
-from app.models.chatbot.model_loader import WhisperModel
-from app.models.chatbot.transcribe_audio import transcribe_audio
-import os
+from app.models.chatbot.chat_history import ChatHistory
+from app.models.chatbot.retrieval import ContextRetriever
+from app.models.chatbot.model_registry import registry
+from app.models.chatbot.session_store import ChatSessionStore, DiskSessionBackend
+from app.models.chatbot.ingestion_jobs import IngestionJobManager
+from app.models.chatbot.llm_metrics import llm_metrics
+from concurrent.futures import ThreadPoolExecutor
 import io
+import json
+import uuid
 
 bp = Blueprint('chatbot', __name__)
+sock = Sock()
 
-# Initialize components
-llm = ChatOllama(
-    model=Config.LLM_MODEL,
-    temperature=Config.LLM_TEMPERATURE,
-    verbose=True,
-    base_url=Config.OLLAMA_BASE_URL
-)
+# Heavy components (Whisper, embeddings, LLM) are loaded lazily through the
+# registry so importing this blueprint stays cheap.
+@bp.record_once
+def _warm_up_models(state):
+    if Config.WARMUP_MODELS:
+        registry.warm_up()
 
-def initialize_components():
-    # 1. First load Whisper (audio processing)
-    os.environ["HF_HOME"] = os.path.join(os.getcwd(), "whisper_cache")
-    whisper_model = WhisperModel()
-    
-    # 2. Then load embeddings (text processing)
-    os.environ["HF_HOME"] = os.path.join(os.getcwd(), "embedding_cache")
-    vector_store_manager = VectorStoreManager(Config.EMBEDDING_MODEL)
-    
-    # 3. Clear cache environment to prevent conflicts
-    if "HF_HOME" in os.environ:
-        del os.environ["HF_HOME"]
-    
-    return whisper_model, vector_store_manager
+# Folds old chat turns into summaries without holding up chat requests
+summary_executor = ThreadPoolExecutor(max_workers=Config.CHAT_SUMMARY_WORKERS, thread_name_prefix="chat-summary")
+
+def _video_context(video_id, vector_store):
+    """Stable per-video text for the system message (the same on every turn)"""
+    texts = registry.vector_store_manager.get_texts(vector_store)
+    opening = " ".join(" ".join(texts[:1]).split()[:Config.CHAT_VIDEO_CONTEXT_WORDS])
+    return f"YouTube video {video_id}. The transcript begins: {opening}" if opening else f"YouTube video {video_id}."
 
-whisper_model, vector_store_manager = initialize_components()
-processor = whisper_model.get_processor()
-model = whisper_model.get_model()
-print("Whisper and Embedding Model load sucessfully")
+def _new_chat_handler(vector_store, video_id):
+    history = ChatHistory(
+        registry.background_llm,
+        executor=summary_executor,
+        keep_turns=Config.CHAT_HISTORY_KEEP_TURNS,
+        max_tokens=Config.CHAT_HISTORY_MAX_TOKENS,
+        summary_max_words=Config.CHAT_SUMMARY_MAX_WORDS
+    )
+    retriever = ContextRetriever(
+        vector_store,
+        registry.llm,
+        k=Config.RETRIEVAL_K,
+        fetch_k=Config.RETRIEVAL_FETCH_K,
+        search_type=Config.RETRIEVAL_SEARCH_TYPE,
+        mmr_lambda=Config.RETRIEVAL_MMR_LAMBDA,
+        min_similarity=Config.RETRIEVAL_MIN_SIMILARITY,
+        max_context_tokens=Config.RETRIEVAL_MAX_CONTEXT_TOKENS,
+        query_rewrite=Config.RETRIEVAL_QUERY_REWRITE
+    )
+    return ChatHandler(
+        registry.llm,
+        vector_store,
+        history=history,
+        retriever=retriever,
+        video_context=_video_context(video_id, vector_store),
+        answer_cache=registry.answer_cache,
+        video_id=video_id
+    )
 
-#vector_store_manager = VectorStoreManager(bp.config['EMBEDDING_MODEL'])
-transcript_processor = TranscriptProcessor()
-qa_generator = QAGenerator(llm)
+def _build_chat_handler(video_id):
+    """Rebuild a session's handler from the cached index of its video"""
+    vector_store = registry.vector_store_manager.load_cached_vector_store(video_id)
+    if vector_store is None:
+        return None
+    return _new_chat_handler(vector_store, video_id)
+
+# One chat handler per user session, created after their first transcript is processed
+chat_sessions = ChatSessionStore(
+    _build_chat_handler,
+    max_sessions=Config.CHAT_SESSION_MAX,
+    idle_ttl=Config.CHAT_SESSION_TTL_SECONDS,
+    backend=DiskSessionBackend(Config.CHAT_SESSION_DIR) if Config.CHAT_SESSION_DIR else None
+)
+
+ingestion_jobs = IngestionJobManager(
+    max_workers=Config.INGESTION_MAX_WORKERS,
+    job_ttl=Config.INGESTION_JOB_TTL_SECONDS
+)
 
-# Initialize chat handler after first transcript is processed
-chat_handler = None
+def _session_key():
+    if current_user.is_authenticated:
+        return f"user-{current_user.get_id()}"
+    if 'chat_session_id' not in session:
+        session['chat_session_id'] = uuid.uuid4().hex
+    return f"anon-{session['chat_session_id']}"
 
 @bp.route('/')
 def index():
     return redirect(url_for('chat_interface'))
 
+@bp.route('/ready')
+def ready():
+    """Readiness probe reporting the load state of each model component"""
+    # Without warm-up models load on first use, so waiting for them would never end
+    ready = registry.is_ready(registry.CORE) if Config.WARMUP_MODELS else True
+    return jsonify({
+        "ready": ready,
+        "components": registry.status()
+    }), 200 if ready else 503
+
+@bp.route('/llm_metrics')
+def llm_metrics_stats():
+    """Prompt-evaluation vs generation timings of recent chat LLM calls"""
+    stats = llm_metrics.get_stats()
+    # Don't load the embedding model just to report cache stats
+    if registry.is_ready(["answer_cache"]) and registry.answer_cache is not None:
+        stats["answer_cache"] = registry.answer_cache.get_stats()
+    return jsonify(stats)
+
 @bp.route('/chat_interface')
 def chat_interface():
     """Render the main chat interface"""
     return render_template('chat.html')
 
+def _ingest_transcript(job):
+    """Background pipeline: fetch -> chunk -> embed -> index -> QA"""
+    transcript_processor = registry.transcript_processor
+    vector_store_manager = registry.vector_store_manager
+    video_id = transcript_processor.extract_video_id(job.youtube_url)
+
+    # Reuse the cached index when this video was processed before
+    vector_store = vector_store_manager.load_cached_vector_store(video_id)
+    if vector_store is not None:
+        for stage in ("fetch", "chunk", "embed", "index"):
+            job.finish_stage(stage, skipped=True)
+        texts = vector_store_manager.get_texts(vector_store)
+        embeddings = None
+    else:
+        job.start_stage("fetch")
+        entries = transcript_processor.fetch_entries(job.youtube_url)
+        job.finish_stage("fetch")
+
+        # Chunks stream out of the chunker and are embedded a batch at a time,
+        # so embedding starts before the later windows are chunked
+        job.start_stage("chunk")
+        job.start_stage("embed")
+        docs, embeddings, batch = [], [], []
+        for doc in transcript_processor.iter_documents(entries, video_id=video_id):
+            batch.append(doc)
+            if len(batch) >= Config.EMBEDDING_BATCH_SIZE:
+                embeddings.extend(vector_store_manager.embed_documents(batch))
+                docs.extend(batch)
+                batch = []
+        job.finish_stage("chunk")
+        if batch:
+            embeddings.extend(vector_store_manager.embed_documents(batch))
+            docs.extend(batch)
+        texts = [doc.page_content for doc in docs]
+        job.finish_stage("embed")
+
+        job.start_stage("index")
+        vector_store = vector_store_manager.create_vector_store_from_embeddings(docs, embeddings, video_id=video_id)
+        job.finish_stage("index")
+
+    try:
+        vector_store_manager.add_to_global_index(video_id, vector_store, embeddings, user_key=job.session_key)
+    except Exception as e:
+        # Per-video chat still works without the cross-video index
+        print(f"Global index update failed for {video_id}: {e}")
+
+    # Chat can start now; QA pairs keep generating in the background
+    chat_sessions.set(job.session_key, _new_chat_handler(vector_store, video_id), video_id)
+    job.chat_ready = True
+
+    job.start_stage("qa")
+    inputs, outputs = registry.qa_generator.generate_qa_pairs(texts)
+    job.qa_pairs = list(zip([i['question'] for i in inputs], [o['answer'] for o in outputs]))
+    job.finish_stage("qa")
+
 @bp.route('/process_transcript', methods=['POST'])
 def process_transcript():
-    """Process YouTube transcript and initialize chat"""
-    global chat_handler
-    
+    """Queue YouTube transcript processing and return a job to poll"""
     youtube_url = request.json.get('youtube_url')
     if not youtube_url:
         return jsonify({"error": "YouTube URL is required"}), 400
-        
-    df = transcript_processor.get_transcript(youtube_url)
-    if df is None:
-        return jsonify({"error": "Failed to process transcript"}), 500
-        
-    # Prepare documents and create vector store
-    docs = transcript_processor.prepare_documents(df)
-    vector_store = vector_store_manager.create_vector_store(docs)
-    
-    # Generate QA pairs
-    inputs, outputs = qa_generator.generate_qa_pairs(df["text"].tolist())
-    
-    # Initialize chat handler
-    chat_handler = ChatHandler(llm, vector_store)
-    
+
+    job = ingestion_jobs.submit(_ingest_transcript, youtube_url, _session_key())
     return jsonify({
-        "message": "Transcript processed successfully",
-        "qa_pairs": list(zip([i['question'] for i in inputs], [o['answer'] for o in outputs]))
-    })
+        "message": "Transcript processing started",
+        "job_id": job.id,
+        "status_url": url_for('chatbot.transcript_status', job_id=job.id)
+    }), 202
 
-@bp.route('/process_input', methods=['POST'])
-def process_input():
-    """Handle both text and audio inputs"""
-    global chat_handler
-    
-    if chat_handler is None:
-        return jsonify({"error": "Please process a transcript first"}), 400
-        
+@bp.route('/process_transcript/<job_id>', methods=['GET'])
+def transcript_status(job_id):
+    """Per-stage progress of a transcript processing job"""
+    job = ingestion_jobs.get(job_id)
+    if job is None or job.session_key != _session_key():
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
+
+@bp.route('/search', methods=['GET'])
+def search():
+    """
+    Semantic search over processed transcripts. scope=video (requires video_id),
+    scope=user (videos this user processed) or scope=all.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query is required"}), 400
+    global_index = registry.vector_store_manager.global_index
+    if global_index is None:
+        return jsonify({"error": "Global index is disabled"}), 404
+
+    scope = request.args.get('scope', 'user')
+    k = max(1, min(request.args.get('k', 5, type=int), 50))
+    if scope == 'video':
+        video_id = request.args.get('video_id')
+        if not video_id:
+            return jsonify({"error": "video_id is required for scope=video"}), 400
+        docs = global_index.search(query, k, video_id=video_id)
+    elif scope == 'user':
+        docs = global_index.search(query, k, user_key=_session_key())
+    elif scope == 'all':
+        docs = global_index.search(query, k)
+    else:
+        return jsonify({"error": "scope must be video, user or all"}), 400
+
+    return jsonify({"results": [
+        {
+            "video_id": d.metadata["video_id"],
+            "start": d.metadata["start"],
+            "duration": d.metadata["duration"],
+            "text": d.page_content
+        }
+        for d in docs
+    ]})
+
+def _read_user_input():
+    """Return (user_input, input_type, error_response) for a chat request"""
     input_type = request.form.get('input_type')
     
     if input_type == 'audio':
         if 'audio' not in request.files:
-            return jsonify({'error': 'No audio file uploaded'}), 400
+            return None, input_type, (jsonify({'error': 'No audio file uploaded'}), 400)
             
         try:
+            from app.models.chatbot.audio_preprocessor import preprocess_audio
+
             # Process audio input
             audio_file = request.files['audio']
             audio_bytes = audio_file.read()
             audio_io = io.BytesIO(audio_bytes)
             audio_tensor = preprocess_audio(audio_io)
-            transcription_result = transcribe_audio(audio_tensor, processor, model)
-            # Convert transcription result to string
-            if isinstance(transcription_result, list):
-                user_input = " ".join(transcription_result)  # Join list elements
-            elif isinstance(transcription_result, str):
-                user_input = transcription_result
-            else:
-                return jsonify({'error': 'Unexpected transcription format'}), 500
+            # Batched with other concurrent requests by the ASR worker
+            user_input = registry.asr.transcribe(audio_tensor)
                 
         except Exception as e:
-            return jsonify({'error': f'Audio processing failed: {str(e)}'}), 500
+            return None, input_type, (jsonify({'error': f'Audio processing failed: {str(e)}'}), 500)
     else:
         # Process text input
         user_input = request.form.get('message', '')
     
     if not user_input:
-        return jsonify({'error': 'Empty input'}), 400
+        return None, input_type, (jsonify({'error': 'Empty input'}), 400)
+
+    return user_input, input_type, None
+
+@bp.route('/process_input', methods=['POST'])
+def process_input():
+    """Handle both text and audio inputs"""
+    key = _session_key()
+    chat_handler = chat_sessions.get(key)
+    if chat_handler is None:
+        return jsonify({"error": "Please process a transcript first"}), 400
+        
+    user_input, input_type, error = _read_user_input()
+    if error:
+        return error
     
     # Get response from chat handler
     try:
         response = chat_handler.process_chat(user_input)
+        chat_sessions.save(key)
         return jsonify({
             'user_input': user_input,
             'bot_response': response,
@@ -134,6 +285,37 @@ def process_input():
     except Exception as e:
         return jsonify({'error': f'Chat processing failed: {str(e)}'}), 500
 
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@bp.route('/process_input_stream', methods=['POST'])
+def process_input_stream():
+    """Same as /process_input but streams the answer as Server-Sent Events"""
+    key = _session_key()
+    chat_handler = chat_sessions.get(key)
+    if chat_handler is None:
+        return jsonify({"error": "Please process a transcript first"}), 400
+
+    user_input, input_type, error = _read_user_input()
+    if error:
+        return error
+
+    def generate():
+        yield _sse('input', {'user_input': user_input, 'input_type': input_type})
+        try:
+            for token in chat_handler.stream_chat(user_input):
+                yield _sse('token', {'token': token})
+            chat_sessions.save(key)
+            yield _sse('done', {})
+        except Exception as e:
+            yield _sse('error', {'error': f'Chat processing failed: {str(e)}'})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @bp.route('/transcribe', methods=['POST'])
 def transcribe():
     """Legacy ASR endpoint (kept for compatibility)"""
@@ -141,11 +323,52 @@ def transcribe():
         return jsonify({'transcript': 'No audio file uploaded'}), 400
 
     try:
+        from app.models.chatbot.audio_preprocessor import preprocess_audio
+
         audio_file = request.files['audio']
         audio_bytes = audio_file.read()
         audio_io = io.BytesIO(audio_bytes)
         audio_tensor = preprocess_audio(audio_io)
-        transcription = transcribe_audio(audio_tensor, processor, model)
-        return jsonify({'transcript': transcription})
+        transcription = registry.asr.transcribe(audio_tensor)
+        # Legacy clients expect a list of transcripts
+        return jsonify({'transcript': [transcription]})
     except Exception as e:
         return jsonify({'transcript': f'[Error] {str(e)}'}), 500
+
+@sock.route('/asr_stream', bp=bp)
+def asr_stream(ws):
+    """
+    Streaming ASR over WebSocket: the client sends 16 kHz int16 PCM frames as
+    binary messages and "stop" when done; the server replies with
+    {"type": "partial"|"final"|"error", "text": ...} JSON messages.
+    """
+    from app.models.chatbot.streaming_asr import StreamingTranscription
+
+    stream = StreamingTranscription(
+        registry.asr,
+        window_seconds=Config.ASR_MAX_SEGMENT_SECONDS,
+        partial_interval=Config.ASR_PARTIAL_INTERVAL_SECONDS,
+        min_segment_seconds=Config.ASR_STREAM_MIN_SEGMENT_SECONDS,
+        pause_ms=Config.ASR_STREAM_PAUSE_MS,
+        dynamic_range_db=Config.ASR_VAD_DYNAMIC_RANGE_DB
+    )
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            if isinstance(message, str):
+                if message == 'stop':
+                    ws.send(json.dumps({'type': 'final', 'text': stream.finish()}))
+                    break
+                continue
+            partial = stream.add_audio(message)
+            if partial is not None:
+                ws.send(json.dumps({'type': 'partial', 'text': partial}))
+    except ConnectionClosed:
+        pass
+    except Exception as e:
+        try:
+            ws.send(json.dumps({'type': 'error', 'text': f'Streaming transcription failed: {str(e)}'}))
+        except ConnectionClosed:
+            pass
@@ -1,9 +1,20 @@
 from flask import Flask, render_template, request, jsonify, Blueprint
-from app.models.player_bot import generate_response_from_llm
-from app.utils.subtitles import get_subtitles
+from app.config import Config
+from app.models.player_bot import explain_word, explanation_cache
+from app.models.vocab_prefetch import VocabularyPrefetcher
+from app.utils.subtitles import get_subtitles, get_video_id
+import functools
 
 player_bp = Blueprint('player', __name__)
 
+# Warms the explanation cache with the words learners are most likely to click
+vocab_prefetcher = VocabularyPrefetcher(
+    # Background lane, so prefetching never delays a learner's click
+    functools.partial(explain_word, lane="background"),
+    top_n=Config.VOCAB_PREFETCH_TOP_N,
+    max_workers=Config.VOCAB_PREFETCH_WORKERS
+) if Config.VOCAB_PREFETCH_ENABLED else None
+
 @player_bp.route('/player/')
 def video_player():
     return render_template('player.html')
@@ -13,6 +24,12 @@ def subtitles():
     data = request.json
     video_url = data.get('url')
     subtitles = get_subtitles(video_url)
+
+    # Errors come back as a single message, so only prefetch real transcripts
+    video_id = get_video_id(video_url) if video_url else None
+    if vocab_prefetcher and video_id and len(subtitles) > 1:
+        vocab_prefetcher.prefetch(video_id, [s["text"] for s in subtitles])
+
     return jsonify(subtitles)
 
 @player_bp.route('/chatbot', methods=['POST'])
@@ -23,51 +40,14 @@ def chatbot():
         word = data.get('word', '').strip()
         sentence = data.get('sentence', '').strip()
 
-        prompt = f"""
-**You are an expert English tutor specializing in ESL (English as a Second Language).**
-The student clicked on the word "{word}" in this sentence:
-"{sentence}"
-
-Provide a comprehensive explanation using EXACTLY this template (include ALL sections and formatting):
-
-✨ **Word Focus**: _{word}_  
-   - Pronunciation: /.../ (add phonetic if possible)
-   - Part of Speech: (noun/verb/adjective/etc.)
-
-📚 **Core Meanings**:
-1. Primary Definition: (Most common meaning)
-2. Secondary Definition: (Other important meanings)
-
-🔍 **In This Sentence**:  
-   - Explain how the word functions here
-   - Break down any idioms/phrasal verbs if present
-
-🎯 **Learning Tips**:
-   - Memory Trick: (Mnemonic or visual association)
-   - Common Mistakes: (What learners often get wrong)
-   - Related Words: (Synonyms/antonyms/word family)
-
-💬 **Usage Examples**:
-   - Formal: (Professional/formal context example)
-   - Casual: (Everyday conversation example)
-   - Academic: (Writing/essay example)
-
-🌍 **Cultural Note**:  
-   - How native speakers commonly use this word
-   - Any regional variations
-
-📝 **Practice Exercise**:  
-   "Complete this sentence: _[missing word]_"
-
-🔔 **Teacher's Note**:  
-   (Encouraging message about mastering this word)
-
-=== (Response must end with this divider) ===
-"""
-
-        response = generate_response_from_llm(prompt)
+        response = explain_word(word, sentence)
         
         return jsonify({'response': response})
         
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@player_bp.route('/chatbot/cache_stats')
+def chatbot_cache_stats():
+    """Hit/miss counters of the word explanation cache"""
+    return jsonify(explanation_cache.get_stats())
@@ -1,5 +1,6 @@
 let mediaRecorder;
 let audioChunks = [];
+let streamingSession = null;
 
 document.getElementById('text-mode').addEventListener('click', () => {
     toggleInputMode('text');
@@ -32,11 +33,26 @@ function toggleInputMode(mode) {
 
 async function toggleRecording() {
     const button = document.getElementById('start-recording');
-    if (mediaRecorder && mediaRecorder.state === 'recording') {
+    if (streamingSession) {
+        stopStreaming();
+        button.innerHTML = '<i class="fas fa-microphone"></i> Record';
+    } else if (mediaRecorder && mediaRecorder.state === 'recording') {
         mediaRecorder.stop();
         button.innerHTML = '<i class="fas fa-microphone"></i> Record';
     } else {
         const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+
+        // Prefer streaming recognition; fall back to uploading the whole clip
+        if (window.WebSocket && window.AudioContext) {
+            try {
+                await startStreaming(stream);
+                button.innerHTML = '<i class="fas fa-stop"></i> Stop';
+                return;
+            } catch (error) {
+                console.warn('Streaming ASR unavailable, uploading the recording instead:', error);
+            }
+        }
+
         mediaRecorder = new MediaRecorder(stream);
         audioChunks = [];
         
@@ -48,6 +64,78 @@ async function toggleRecording() {
     }
 }
 
+// Stream 16 kHz int16 PCM to /asr_stream and show interim transcripts while recording
+function startStreaming(stream) {
+    return new Promise((resolve, reject) => {
+        const status = document.getElementById('recording-status');
+        const protocol = location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const ws = new WebSocket(`${protocol}//${location.host}/asr_stream`);
+        ws.binaryType = 'arraybuffer';
+        ws.onerror = () => reject(new Error('WebSocket connection failed'));
+
+        ws.onopen = () => {
+            try {
+                const audioContext = new AudioContext({ sampleRate: 16000 });
+                const source = audioContext.createMediaStreamSource(stream);
+                const processor = audioContext.createScriptProcessor(4096, 1, 1);
+
+                processor.onaudioprocess = e => {
+                    const input = e.inputBuffer.getChannelData(0);
+                    const pcm = new Int16Array(input.length);
+                    for (let i = 0; i < input.length; i++) {
+                        const s = Math.max(-1, Math.min(1, input[i]));
+                        pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+                    }
+                    if (ws.readyState === WebSocket.OPEN) ws.send(pcm.buffer);
+                };
+                source.connect(processor);
+                processor.connect(audioContext.destination);
+
+                streamingSession = { ws, audioContext, source, processor, stream };
+                resolve();
+            } catch (error) {
+                ws.close();
+                reject(error);
+            }
+        };
+
+        ws.onmessage = event => {
+            const data = JSON.parse(event.data);
+            if (data.type === 'partial') {
+                status.textContent = data.text;
+            } else if (data.type === 'final') {
+                status.textContent = '';
+                ws.close();
+                sendTranscript(data.text);
+            } else if (data.type === 'error') {
+                status.textContent = '';
+                ws.close();
+                alert(data.text);
+            }
+        };
+    });
+}
+
+function stopStreaming() {
+    const { ws, audioContext, source, processor, stream } = streamingSession;
+    streamingSession = null;
+    processor.disconnect();
+    source.disconnect();
+    audioContext.close();
+    stream.getTracks().forEach(track => track.stop());
+    // The server answers with the final transcript
+    ws.send('stop');
+}
+
+function sendTranscript(text) {
+    if (!text) return;
+    const formData = new FormData();
+    formData.append('message', text);
+    formData.append('input_type', 'transcript');
+
+    processInput(formData);
+}
+
 async function sendAudio() {
     const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
     const formData = new FormData();
@@ -68,24 +156,52 @@ async function sendMessage() {
 }
 
 async function processInput(formData) {
-    const chatHistory = document.getElementById('chat-history');
-    const response = await fetch('/process_input', {
+    const response = await fetch('/process_input_stream', {
         method: 'POST',
         body: formData
     });
-    
-    const data = await response.json();
-    
-    if (data.error) {
-        alert(data.error);
+
+    if (!response.ok) {
+        const data = await response.json();
+        alert(data.error || 'Chat processing failed');
         return;
     }
-    
-    // Add user message
-    addMessage(data.user_input, 'user', data.input_type);
-    
-    // Add bot response
-    addMessage(data.bot_response, 'bot');
+
+    // Read the Server-Sent Events stream and grow the bot message as tokens arrive
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let botContent = null;
+    let botText = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        for (const raw of events) {
+            const event = (raw.match(/^event: (.*)$/m) || [])[1];
+            const dataLine = (raw.match(/^data: (.*)$/m) || [])[1];
+            if (!event || dataLine === undefined) continue;
+            const data = JSON.parse(dataLine);
+
+            if (event === 'input') {
+                // Add user message, then an empty bot message to stream into
+                addMessage(data.user_input, 'user', data.input_type);
+                botContent = addMessage('', 'bot').querySelector('.message-content');
+            } else if (event === 'token' && botContent) {
+                botText += data.token;
+                botContent.textContent = botText;
+                const chatHistory = document.getElementById('chat-history');
+                chatHistory.scrollTop = chatHistory.scrollHeight;
+            } else if (event === 'error') {
+                alert(data.error);
+            }
+        }
+    }
 }
 
 function addMessage(content, sender, inputType = null) {
@@ -98,7 +214,7 @@ function addMessage(content, sender, inputType = null) {
             <div class="message-header">
                 <span class="sender">You</span>
                 <span class="message-type">
-                    ${inputType === 'audio' ? '<i class="fas fa-microphone"></i>' : '<i class="fas fa-keyboard"></i>'}
+                    ${inputType === 'audio' || inputType === 'transcript' ? '<i class="fas fa-microphone"></i>' : '<i class="fas fa-keyboard"></i>'}
                 </span>
             </div>
             <div class="message-content">${content}</div>
@@ -115,4 +231,5 @@ function addMessage(content, sender, inputType = null) {
     
     chatHistory.appendChild(messageDiv);
     chatHistory.scrollTop = chatHistory.scrollHeight;
+    return messageDiv;
 }
\ No newline at end of file